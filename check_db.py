@@ -1,5 +1,12 @@
 import sqlite3
 import os
+import sys
+
+# The large raw/stg tables are counted with MAX(rowid), which is
+# near-instant but only an upper bound: it over-counts once rows have been
+# deleted or replaced. Every other table is small and counted with COUNT(*);
+# pass --exact to COUNT(*) every table instead.
+exact = '--exact' in sys.argv
 
 db_path = os.path.join(os.path.dirname(__file__), 'database', 'banking.db')
 print(f"Database: {db_path}")
@@ -10,19 +17,29 @@ if not os.path.exists(db_path):
     exit()
 
 conn = sqlite3.connect(db_path)
+conn.execute("PRAGMA query_only=1")
 cursor = conn.cursor()
 
-cursor.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name")
+cursor.execute("SELECT name, sql FROM sqlite_master WHERE type='table' ORDER BY name")
 tables = cursor.fetchall()
 
 print(f"\nTotal tables: {len(tables)}\n")
-print(f"{'Table Name':<40} {'Rows':>10}")
-print("-" * 52)
-
-for t in tables:
-    name = t[0]
-    cursor.execute(f"SELECT COUNT(*) FROM [{name}]")
-    count = cursor.fetchone()[0]
-    print(f"{name:<40} {count:>10}")
+print(f"{'Table Name':<40} {'Rows' if exact else 'Rows (approx)':>14}")
+print("-" * 56)
+
+# Count every table in one statement instead of one query per table
+if tables:
+    parts = []
+    for name, table_sql in tables:
+        approx = name.startswith(('raw', 'stg')) and 'WITHOUT ROWID' not in (table_sql or '').upper()
+        row_count = "COALESCE(MAX(rowid), 0)" if approx and not exact else "COUNT(*)"
+        parts.append(f"SELECT '{name}' AS name, {row_count} AS c FROM [{name}]")
+    sql = " UNION ALL ".join(parts)
+    with conn:
+        cursor.execute(sql)
+        counts = cursor.fetchall()
+
+    for name, count in counts:
+        print(f"{name:<40} {count:>14}")
 
 conn.close()
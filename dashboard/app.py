@@ -11,10 +11,13 @@ Author: Nevra Donat
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 import sqlite3
 import plotly.express as px
 import plotly.graph_objects as go
 import os
+import queue
+from contextlib import contextmanager
 from datetime import datetime
 
 # ============================================================================
@@ -37,53 +40,217 @@ def get_project_root():
 # Database path
 DB_PATH = os.path.normpath(os.path.join(get_project_root(), 'database', 'banking.db'))
 
+# SQLite page cache size in KiB (default 256 MiB)
+SQLITE_CACHE_KIB = int(os.environ.get('DASHBOARD_SQLITE_CACHE_KIB', 262144))
+
+# Number of read-only connections shared across Streamlit sessions
+POOL_SIZE = 4
+
+# Most query results kept by cached_query (filter combinations add up)
+QUERY_CACHE_ENTRIES = 256
+
 
 # ============================================================================
 # DATABASE FUNCTIONS
 # ============================================================================
 
+def open_connection():
+    """Open a database connection tuned for read-heavy dashboard queries."""
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+
+    # Keep the working set in RAM and memory-map the file; the dashboard never writes
+    # (WAL mode is set on the database by database_creator.py and the ETL steps)
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_KIB}")
+    conn.execute("PRAGMA mmap_size=268435456")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA query_only=1")
+    return conn
+
+
 @st.cache_resource
-def get_connection():
-    """Get database connection."""
+def get_connection_pool():
+    """Get the shared pool of read-only connections (None if no database)."""
     if not os.path.exists(DB_PATH):
         return None
-    return sqlite3.connect(DB_PATH, check_same_thread=False)
+    pool = queue.Queue()
+    for _ in range(POOL_SIZE):
+        pool.put(open_connection())
+    return pool
+
+
+@contextmanager
+def acquire_connection():
+    """Borrow a connection from the pool and return it when done."""
+    pool = get_connection_pool()
+    if pool is None:
+        yield None
+        return
+    conn = pool.get()
+    try:
+        yield conn
+    finally:
+        pool.put(conn)
+
+
+@st.cache_data(ttl=10, show_spinner=False)
+def data_version():
+    """
+    Get the latest updated_at of rptDashboardKPIs (rewritten by stg_to_rpt)
+    and _table_counts (rewritten by raw_to_stg and stg_to_rpt).
+
+    Query caches are keyed on this value, so they stay valid for as long as
+    the data is unchanged and are dropped as soon as a new run lands.
+    A missing table is skipped, so either ETL step alone changes the version.
+    """
+    with acquire_connection() as conn:
+        if conn is None:
+            return None
+        versions = []
+        for table in ('rptDashboardKPIs', '_table_counts'):
+            try:
+                versions.append(conn.execute(f"SELECT MAX(updated_at) FROM {table}").fetchone()[0])
+            except sqlite3.Error:
+                pass
+        versions = [v for v in versions if v is not None]
+        return max(versions) if versions else None
 
 
-@st.cache_data(ttl=60)
-def run_query(query):
-    """Run a SQL query and return DataFrame."""
-    conn = get_connection()
-    if conn is None:
-        return pd.DataFrame()
+def read_query(query, params=()):
+    """
+    Run a SQL query and return DataFrame, without caching (errors are raised).
+
+    Columns are Arrow-backed, so st.dataframe can send them without first
+    converting Python string objects.
+    """
+    with acquire_connection() as conn:
+        if conn is None:
+            return pd.DataFrame()
+        return pd.read_sql_query(query, conn, params=params, dtype_backend='pyarrow')
+
+
+@st.cache_resource(ttl=3600, max_entries=QUERY_CACHE_ENTRIES, show_spinner=False)
+def cached_query(query, params, version):
+    """
+    Run a SQL query for a given data version and return DataFrame.
+
+    Results are cached as shared resources so cache hits skip the pickle
+    round-trip of st.cache_data; callers must treat them as read-only.
+    A failing query raises, so its error is not cached.
+    """
+    return read_query(query, params)
+
+
+def run_query(query, params=()):
+    """Run a SQL query with optional bound parameters and return DataFrame."""
     try:
-        return pd.read_sql_query(query, conn)
+        return cached_query(query, params, data_version())
     except Exception as e:
         st.error(f"Query error: {e}")
         return pd.DataFrame()
 
 
+def known_tables():
+    """Get the set of table names in the database."""
+    df = run_query("SELECT name FROM sqlite_master WHERE type='table'")
+    if len(df) == 0:
+        return frozenset()
+    return frozenset(df['name'])
+
+
 def table_exists(table_name):
     """Check if a table exists."""
-    conn = get_connection()
-    if conn is None:
-        return False
-    cursor = conn.cursor()
-    cursor.execute(
-        "SELECT name FROM sqlite_master WHERE type='table' AND name=?",
-        (table_name,)
-    )
-    return cursor.fetchone() is not None
+    return table_name in known_tables()
+
+
+def load_table_counts():
+    """
+    Get row counts for every table as a DataFrame (Table, Rows).
+
+    Reads the _table_counts table maintained by the ETL scripts, and falls
+    back to counting every table in one UNION ALL query if it is missing.
+    """
+    if table_exists('_table_counts'):
+        return run_query("SELECT name AS [Table], n AS [Rows] FROM _table_counts ORDER BY name")
+
+    tables = sorted(known_tables())
+    if not tables:
+        return pd.DataFrame(columns=['Table', 'Rows'])
+    return run_query(" UNION ALL ".join(
+        f"SELECT '{name}' AS [Table], COUNT(*) AS [Rows] FROM [{name}]" for name in tables
+    ))
+
+
+def distinct_values(table_name, columns):
+    """
+    Get the distinct values of several columns in one query, e.g. to populate
+    a page's filter dropdowns. Returns {column: [values]}.
+    """
+    df = run_query(" UNION ALL ".join(
+        f"SELECT '{col}' AS k, [{col}] AS v FROM [{table_name}] GROUP BY [{col}]"
+        for col in columns
+    ))
+    if len(df) == 0:
+        return {col: [] for col in columns}
+    return {col: df.loc[df['k'] == col, 'v'].tolist() for col in columns}
+
+
+def load_customer_breakdown():
+    """
+    Get customer counts by segment and by risk rating in one scan.
+
+    Returns rows of (dim, key, count) where dim is 'segment' or 'risk'.
+    """
+    return run_query("""
+        SELECT 'segment' AS dim, segment AS key, SUM(customer_count) AS count
+        FROM rptCustomerSummary
+        GROUP BY segment
+        UNION ALL
+        SELECT 'risk', risk_rating, SUM(customer_count)
+        FROM rptCustomerSummary
+        GROUP BY risk_rating
+    """)
+
+
+def load_account_breakdown():
+    """Get account counts and balances by account type in one scan."""
+    return run_query("""
+        SELECT account_type,
+               SUM(account_count) AS count,
+               SUM(total_balance) AS balance,
+               SUM(CASE WHEN total_balance > 0 THEN total_balance END) AS positive_balance
+        FROM rptAccountSummary
+        GROUP BY account_type
+    """)
+
+
+def split_breakdown(df, dim, key_column):
+    """Select one dimension of a (dim, key, count) breakdown as (key_column, count)."""
+    if len(df) == 0:
+        return df
+    return df[df['dim'] == dim].drop(columns='dim').rename(columns={'key': key_column})
+
+
+def load_all_kpis():
+    """
+    Load every KPI from rptDashboardKPIs (a single row, one column per KPI)
+    as a {name: value} dict, leaving out KPIs that weren't computed.
+    """
+    if not table_exists('rptDashboardKPIs'):
+        return {}
+    df = run_query("SELECT * FROM rptDashboardKPIs")
+    if len(df) == 0:
+        return {}
+    # Databases built before the single-row layout hold one row per KPI
+    if 'kpi_name' in df.columns:
+        return dict(zip(df['kpi_name'], df['kpi_value']))
+    row = df.iloc[0].drop('updated_at')
+    return {name: value for name, value in row.items() if pd.notna(value)}
 
 
 def get_kpi_value(kpi_name, default=0):
     """Get a KPI value from rptDashboardKPIs."""
-    if not table_exists('rptDashboardKPIs'):
-        return default
-    df = run_query(f"SELECT kpi_value FROM rptDashboardKPIs WHERE kpi_name = '{kpi_name}'")
-    if len(df) > 0:
-        return df.iloc[0]['kpi_value']
-    return default
+    return load_all_kpis().get(kpi_name, default)
 
 
 # ============================================================================
@@ -105,6 +272,30 @@ def render_kpi_card(title, value, format_type='number', delta=None, icon=None):
     st.metric(label=title, value=formatted, delta=delta)
 
 
+@st.cache_data(ttl=60, show_spinner=False)
+def build_pie_chart(df, values, names, colors=None, color_map=None):
+    """Build a pie chart figure (cached, keyed on the chart data)."""
+    if color_map:
+        fig = px.pie(df, values=values, names=names,
+                    color=names,
+                    color_discrete_map=color_map)
+    else:
+        fig = px.pie(df, values=values, names=names,
+                    color_discrete_sequence=colors)
+    fig.update_layout(margin=dict(l=20, r=20, t=30, b=20))
+    return fig
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def build_bar_chart(df, x, y, colors):
+    """Build a bar chart figure colored by category (cached, keyed on the chart data)."""
+    fig = px.bar(df, x=x, y=y,
+                color=x,
+                color_discrete_sequence=colors)
+    fig.update_layout(showlegend=False, margin=dict(l=20, r=20, t=30, b=20))
+    return fig
+
+
 def render_section_header(title, icon=None):
     """Render a section header."""
     if icon:
@@ -132,26 +323,23 @@ def main():
 
         st.markdown("---")
 
-        # Refresh button
+        # Refresh button (re-reads the data version and drops cached query
+        # results, e.g. after changes the version does not track)
         if st.button("🔄 Refresh Data"):
-            st.cache_data.clear()
+            data_version.clear()
+            cached_query.clear()
             st.rerun()
 
         # Database info
         st.markdown("---")
         st.markdown("**Database Info**")
-        conn = get_connection()
-        if conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type='table'")
-            table_count = cursor.fetchone()[0]
-            st.caption(f"Tables: {table_count}")
+        if get_connection_pool() is not None:
+            st.caption(f"Tables: {len(known_tables())}")
 
             # Last update
-            if table_exists('rptDashboardKPIs'):
-                df = run_query("SELECT MAX(updated_at) as last_update FROM rptDashboardKPIs")
-                if len(df) > 0 and df.iloc[0]['last_update']:
-                    st.caption(f"Updated: {df.iloc[0]['last_update']}")
+            last_update = data_version()
+            if last_update:
+                st.caption(f"Updated: {last_update}")
         else:
             st.warning("Database not found")
 
@@ -194,42 +382,44 @@ def render_overview_page():
     st.title("🏦 Banking ETL Dashboard")
     st.markdown("Real-time overview of banking operations and metrics.")
 
+    kpis = load_all_kpis()
+
     # KPI Row 1
     col1, col2, col3, col4 = st.columns(4)
 
     with col1:
-        value = get_kpi_value('total_customers', 0)
+        value = kpis.get('total_customers', 0)
         render_kpi_card("Total Customers", value, icon="👥")
 
     with col2:
-        value = get_kpi_value('total_accounts', 0)
+        value = kpis.get('total_accounts', 0)
         render_kpi_card("Total Accounts", value, icon="💳")
 
     with col3:
-        value = get_kpi_value('total_balance', 0)
+        value = kpis.get('total_balance', 0)
         render_kpi_card("Total Balance", value, format_type='currency', icon="💵")
 
     with col4:
-        value = get_kpi_value('total_loans', 0)
+        value = kpis.get('total_loans', 0)
         render_kpi_card("Active Loans", value, icon="📋")
 
     # KPI Row 2
     col1, col2, col3, col4 = st.columns(4)
 
     with col1:
-        value = get_kpi_value('total_branches', 0)
+        value = kpis.get('total_branches', 0)
         render_kpi_card("Branches", value, icon="🏢")
 
     with col2:
-        value = get_kpi_value('total_employees', 0)
+        value = kpis.get('total_employees', 0)
         render_kpi_card("Employees", value, icon="👔")
 
     with col3:
-        value = get_kpi_value('total_credit_cards', 0)
+        value = kpis.get('total_credit_cards', 0)
         render_kpi_card("Credit Cards", value, icon="💳")
 
     with col4:
-        value = get_kpi_value('pending_transactions', 0)
+        value = kpis.get('pending_transactions', 0)
         render_kpi_card("Pending Txns", value, icon="⏳")
 
     st.markdown("---")
@@ -240,15 +430,9 @@ def render_overview_page():
     with col1:
         render_section_header("Account Distribution", "📊")
         if table_exists('rptAccountSummary'):
-            df = run_query("""
-                SELECT account_type, SUM(account_count) as count
-                FROM rptAccountSummary
-                GROUP BY account_type
-            """)
+            df = load_account_breakdown()
             if len(df) > 0:
-                fig = px.pie(df, values='count', names='account_type',
-                            color_discrete_sequence=px.colors.qualitative.Set2)
-                fig.update_layout(margin=dict(l=20, r=20, t=30, b=20))
+                fig = build_pie_chart(df, 'count', 'account_type', colors=px.colors.qualitative.Set2)
                 st.plotly_chart(fig, use_container_width=True)
             else:
                 st.info("No account data available")
@@ -258,15 +442,9 @@ def render_overview_page():
     with col2:
         render_section_header("Customer Segments", "👥")
         if table_exists('rptCustomerSummary'):
-            df = run_query("""
-                SELECT segment, SUM(customer_count) as count
-                FROM rptCustomerSummary
-                GROUP BY segment
-            """)
+            df = split_breakdown(load_customer_breakdown(), 'segment', 'segment')
             if len(df) > 0:
-                fig = px.pie(df, values='count', names='segment',
-                            color_discrete_sequence=px.colors.qualitative.Pastel)
-                fig.update_layout(margin=dict(l=20, r=20, t=30, b=20))
+                fig = build_pie_chart(df, 'count', 'segment', colors=px.colors.qualitative.Pastel)
                 st.plotly_chart(fig, use_container_width=True)
             else:
                 st.info("No customer data available")
@@ -316,95 +494,80 @@ def render_overview_page():
 def render_customers_page():
     st.title("👥 Customer Analytics")
 
+    kpis = load_all_kpis()
+
     # KPIs
     col1, col2, col3, col4 = st.columns(4)
 
     with col1:
-        value = get_kpi_value('total_customers', 0)
+        value = kpis.get('total_customers', 0)
         render_kpi_card("Total Customers", value)
 
     with col2:
-        value = get_kpi_value('active_customers', 0)
+        value = kpis.get('active_customers', 0)
         render_kpi_card("Active Customers", value)
 
     with col3:
-        if table_exists('stgCustomerProfiles'):
-            df = run_query("SELECT COUNT(DISTINCT segment) as count FROM stgCustomerProfiles")
-            value = df.iloc[0]['count'] if len(df) > 0 else 0
-        else:
-            value = 0
+        value = kpis.get('distinct_customer_segments', 0)
         render_kpi_card("Segments", value)
 
     with col4:
-        if table_exists('rptCustomerSummary'):
-            df = run_query("SELECT SUM(customer_count) as count FROM rptCustomerSummary WHERE risk_rating = 'high'")
-            value = df.iloc[0]['count'] if len(df) > 0 and df.iloc[0]['count'] else 0
-        else:
-            value = 0
+        value = kpis.get('high_risk_customers', 0)
         render_kpi_card("High Risk", value)
 
     st.markdown("---")
 
-    # Charts
+    # Charts (segment and risk breakdowns share one query)
     col1, col2 = st.columns(2)
+    if table_exists('rptCustomerSummary'):
+        breakdown = load_customer_breakdown()
 
     with col1:
         render_section_header("Customers by Segment")
         if table_exists('rptCustomerSummary'):
-            df = run_query("""
-                SELECT segment, SUM(customer_count) as count
-                FROM rptCustomerSummary
-                GROUP BY segment
-                ORDER BY count DESC
-            """)
+            df = split_breakdown(breakdown, 'segment', 'segment')
             if len(df) > 0:
-                fig = px.bar(df, x='segment', y='count',
-                            color='segment',
-                            color_discrete_sequence=px.colors.qualitative.Set2)
-                fig.update_layout(showlegend=False, margin=dict(l=20, r=20, t=30, b=20))
+                df = df.sort_values('count', ascending=False)
+                fig = build_bar_chart(df, 'segment', 'count', px.colors.qualitative.Set2)
                 st.plotly_chart(fig, use_container_width=True)
 
     with col2:
         render_section_header("Risk Rating Distribution")
         if table_exists('rptCustomerSummary'):
-            df = run_query("""
-                SELECT risk_rating, SUM(customer_count) as count
-                FROM rptCustomerSummary
-                GROUP BY risk_rating
-            """)
+            df = split_breakdown(breakdown, 'risk', 'risk_rating')
             if len(df) > 0:
                 colors = {'low': 'green', 'medium': 'orange', 'high': 'red', 'Unknown': 'gray'}
-                fig = px.pie(df, values='count', names='risk_rating',
-                            color='risk_rating',
-                            color_discrete_map=colors)
-                fig.update_layout(margin=dict(l=20, r=20, t=30, b=20))
+                fig = build_pie_chart(df, 'count', 'risk_rating', color_map=colors)
                 st.plotly_chart(fig, use_container_width=True)
 
     # Customer Table
     render_section_header("Customer List")
     if table_exists('stgCustomerProfiles'):
         # Filters
+        options = distinct_values('stgCustomerProfiles', ('segment', 'risk_rating'))
         col1, col2, col3 = st.columns(3)
         with col1:
-            segments = run_query("SELECT DISTINCT segment FROM stgCustomerProfiles")
-            segment_filter = st.multiselect("Segment", segments['segment'].tolist() if len(segments) > 0 else [])
+            segment_filter = st.multiselect("Segment", options['segment'])
         with col2:
-            ratings = run_query("SELECT DISTINCT risk_rating FROM stgCustomerProfiles")
-            risk_filter = st.multiselect("Risk Rating", ratings['risk_rating'].tolist() if len(ratings) > 0 else [])
+            risk_filter = st.multiselect("Risk Rating", options['risk_rating'])
         with col3:
             search = st.text_input("Search by Name")
 
         # Build query
         query = "SELECT customer_id, name, email, city, segment, risk_rating, status FROM stgCustomerProfiles WHERE 1=1"
+        params = []
         if segment_filter:
-            query += f" AND segment IN ({','.join([repr(s) for s in segment_filter])})"
+            query += f" AND segment IN ({','.join('?' * len(segment_filter))})"
+            params.extend(segment_filter)
         if risk_filter:
-            query += f" AND risk_rating IN ({','.join([repr(r) for r in risk_filter])})"
+            query += f" AND risk_rating IN ({','.join('?' * len(risk_filter))})"
+            params.extend(risk_filter)
         if search:
-            query += f" AND name LIKE '%{search}%'"
+            query += " AND name LIKE ?"
+            params.append(f"%{search}%")
         query += " LIMIT 100"
 
-        df = run_query(query)
+        df = run_query(query, tuple(params))
         st.dataframe(df, use_container_width=True, hide_index=True)
 
 
@@ -415,79 +578,75 @@ def render_customers_page():
 def render_accounts_page():
     st.title("💳 Account Analytics")
 
+    kpis = load_all_kpis()
+
     # KPIs
     col1, col2, col3, col4 = st.columns(4)
 
     with col1:
-        value = get_kpi_value('total_accounts', 0)
+        value = kpis.get('total_accounts', 0)
         render_kpi_card("Total Accounts", value)
 
     with col2:
-        value = get_kpi_value('total_balance', 0)
+        value = kpis.get('total_balance', 0)
         render_kpi_card("Total Balance", value, format_type='currency')
 
     with col3:
-        value = get_kpi_value('avg_account_balance', 0)
+        value = kpis.get('avg_account_balance', 0)
         render_kpi_card("Avg Balance", value, format_type='currency')
 
     with col4:
-        value = get_kpi_value('total_credit_cards', 0)
+        value = kpis.get('total_credit_cards', 0)
         render_kpi_card("Credit Cards", value)
 
     st.markdown("---")
 
-    # Charts
+    # Charts (both read the same account breakdown query)
     col1, col2 = st.columns(2)
+    if table_exists('rptAccountSummary'):
+        breakdown = load_account_breakdown()
 
     with col1:
         render_section_header("Accounts by Type")
         if table_exists('rptAccountSummary'):
-            df = run_query("""
-                SELECT account_type, SUM(account_count) as count, SUM(total_balance) as balance
-                FROM rptAccountSummary
-                GROUP BY account_type
-            """)
+            df = breakdown
             if len(df) > 0:
-                fig = px.bar(df, x='account_type', y='count',
-                            color='account_type',
-                            color_discrete_sequence=px.colors.qualitative.Bold)
-                fig.update_layout(showlegend=False, margin=dict(l=20, r=20, t=30, b=20))
+                fig = build_bar_chart(df, 'account_type', 'count', px.colors.qualitative.Bold)
                 st.plotly_chart(fig, use_container_width=True)
 
     with col2:
         render_section_header("Balance by Account Type")
         if table_exists('rptAccountSummary'):
-            df = run_query("""
-                SELECT account_type, SUM(total_balance) as balance
-                FROM rptAccountSummary
-                WHERE total_balance > 0
-                GROUP BY account_type
-            """)
+            df = breakdown
             if len(df) > 0:
-                fig = px.pie(df, values='balance', names='account_type',
-                            color_discrete_sequence=px.colors.qualitative.Set3)
-                fig.update_layout(margin=dict(l=20, r=20, t=30, b=20))
+                df = (df.dropna(subset=['positive_balance'])
+                      [['account_type', 'positive_balance']]
+                      .rename(columns={'positive_balance': 'balance'}))
+            if len(df) > 0:
+                fig = build_pie_chart(df, 'balance', 'account_type', colors=px.colors.qualitative.Set3)
                 st.plotly_chart(fig, use_container_width=True)
 
     # Account Table
     render_section_header("Account List")
     if table_exists('stgAccountProducts'):
+        options = distinct_values('stgAccountProducts', ('account_type', 'status'))
         col1, col2 = st.columns(2)
         with col1:
-            types = run_query("SELECT DISTINCT account_type FROM stgAccountProducts")
-            type_filter = st.multiselect("Account Type", types['account_type'].tolist() if len(types) > 0 else [])
+            type_filter = st.multiselect("Account Type", options['account_type'])
         with col2:
-            status = run_query("SELECT DISTINCT status FROM stgAccountProducts")
-            status_filter = st.multiselect("Status", status['status'].tolist() if len(status) > 0 else [])
+            status_filter = st.multiselect("Status", options['status'])
 
         query = "SELECT account_id, customer_id, account_type, balance, currency, status FROM stgAccountProducts WHERE 1=1"
+        params = []
         if type_filter:
-            query += f" AND account_type IN ({','.join([repr(t) for t in type_filter])})"
+            query += f" AND account_type IN ({','.join('?' * len(type_filter))})"
+            params.extend(type_filter)
         if status_filter:
-            query += f" AND status IN ({','.join([repr(s) for s in status_filter])})"
+            query += f" AND status IN ({','.join('?' * len(status_filter))})"
+            params.extend(status_filter)
         query += " ORDER BY balance DESC LIMIT 100"
 
-        df = run_query(query)
+        df = run_query(query, tuple(params))
         st.dataframe(df, use_container_width=True, hide_index=True)
 
 
@@ -498,61 +657,52 @@ def render_accounts_page():
 def render_loans_page():
     st.title("💰 Loan Portfolio")
 
+    kpis = load_all_kpis()
+
     # KPIs
     col1, col2, col3, col4 = st.columns(4)
 
     with col1:
-        value = get_kpi_value('total_loans', 0)
+        value = kpis.get('total_loans', 0)
         render_kpi_card("Total Loans", value)
 
     with col2:
-        value = get_kpi_value('active_loans', 0)
+        value = kpis.get('active_loans', 0)
         render_kpi_card("Active Loans", value)
 
     with col3:
-        value = get_kpi_value('total_loan_amount', 0)
+        value = kpis.get('total_loan_amount', 0)
         render_kpi_card("Total Principal", value, format_type='currency')
 
     with col4:
-        if table_exists('stgLoans'):
-            df = run_query("SELECT AVG(interest_rate) as avg_rate FROM stgLoans")
-            value = df.iloc[0]['avg_rate'] if len(df) > 0 and df.iloc[0]['avg_rate'] else 0
-        else:
-            value = 0
+        value = kpis.get('avg_interest_rate', 0)
         render_kpi_card("Avg Interest Rate", value, format_type='percent')
 
     st.markdown("---")
 
-    # Charts
+    # Charts (count and principal come from one GROUP BY)
     col1, col2 = st.columns(2)
+    if table_exists('rptLoanSummary'):
+        breakdown = run_query("""
+            SELECT loan_type, SUM(loan_count) as count, SUM(total_principal) as principal
+            FROM rptLoanSummary
+            GROUP BY loan_type
+        """)
 
     with col1:
         render_section_header("Loans by Type")
         if table_exists('rptLoanSummary'):
-            df = run_query("""
-                SELECT loan_type, SUM(loan_count) as count
-                FROM rptLoanSummary
-                GROUP BY loan_type
-            """)
+            df = breakdown
             if len(df) > 0:
-                fig = px.bar(df, x='loan_type', y='count',
-                            color='loan_type',
-                            color_discrete_sequence=px.colors.qualitative.Vivid)
-                fig.update_layout(showlegend=False, margin=dict(l=20, r=20, t=30, b=20))
+                fig = build_bar_chart(df, 'loan_type', 'count', px.colors.qualitative.Vivid)
                 st.plotly_chart(fig, use_container_width=True)
 
     with col2:
         render_section_header("Principal by Loan Type")
         if table_exists('rptLoanSummary'):
-            df = run_query("""
-                SELECT loan_type, SUM(total_principal) as principal
-                FROM rptLoanSummary
-                GROUP BY loan_type
-            """)
+            df = breakdown
             if len(df) > 0:
-                fig = px.pie(df, values='principal', names='loan_type',
-                            color_discrete_sequence=px.colors.qualitative.Dark2)
-                fig.update_layout(margin=dict(l=20, r=20, t=30, b=20))
+                fig = build_pie_chart(df, 'principal', 'loan_type', colors=px.colors.qualitative.Dark2)
                 st.plotly_chart(fig, use_container_width=True)
 
     # Loan Table
@@ -574,27 +724,25 @@ def render_loans_page():
 def render_operations_page():
     st.title("🏢 Operations")
 
+    kpis = load_all_kpis()
+
     # KPIs
     col1, col2, col3, col4 = st.columns(4)
 
     with col1:
-        value = get_kpi_value('total_branches', 0)
+        value = kpis.get('total_branches', 0)
         render_kpi_card("Branches", value, icon="🏢")
 
     with col2:
-        value = get_kpi_value('total_employees', 0)
+        value = kpis.get('total_employees', 0)
         render_kpi_card("Employees", value, icon="👔")
 
     with col3:
-        value = get_kpi_value('total_atms', 0)
+        value = kpis.get('total_atms', 0)
         render_kpi_card("ATMs", value, icon="🏧")
 
     with col4:
-        if table_exists('stgAtmLocations'):
-            df = run_query("SELECT COUNT(*) as count FROM stgAtmLocations WHERE status = 'operational'")
-            value = df.iloc[0]['count'] if len(df) > 0 else 0
-        else:
-            value = 0
+        value = kpis.get('atms_operational', 0)
         render_kpi_card("ATMs Online", value, icon="✅")
 
     st.markdown("---")
@@ -623,10 +771,7 @@ def render_operations_page():
                 ORDER BY count DESC
             """)
             if len(df) > 0:
-                fig = px.bar(df, x='role', y='count',
-                            color='role',
-                            color_discrete_sequence=px.colors.qualitative.Pastel)
-                fig.update_layout(showlegend=False, margin=dict(l=20, r=20, t=30, b=20))
+                fig = build_bar_chart(df, 'role', 'count', px.colors.qualitative.Pastel)
                 st.plotly_chart(fig, use_container_width=True)
 
 
@@ -659,7 +804,8 @@ def render_analytics_page():
     if st.button("▶️ Execute Query"):
         if query.strip():
             try:
-                df = run_query(query)
+                # Ad-hoc SQL is not cached
+                df = read_query(query)
                 st.success(f"Query returned {len(df)} rows")
                 st.dataframe(df, use_container_width=True)
             except Exception as e:
@@ -672,32 +818,15 @@ def render_analytics_page():
     # Database Statistics
     render_section_header("Database Statistics", "📊")
 
-    if get_connection():
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        # Get all tables with row counts
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name")
-        tables = cursor.fetchall()
-
-        table_stats = []
-        for table in tables:
-            table_name = table[0]
-            cursor.execute(f"SELECT COUNT(*) FROM [{table_name}]")
-            count = cursor.fetchone()[0]
-            if table_name.startswith('raw'):
-                layer = 'Raw'
-            elif table_name.startswith('stg'):
-                layer = 'Staging'
-            elif table_name.startswith('rpt'):
-                layer = 'Report'
-            elif table_name.startswith('_'):
-                layer = 'System'
-            else:
-                layer = 'Other'
-            table_stats.append({'Table': table_name, 'Layer': layer, 'Rows': count})
-
-        df_stats = pd.DataFrame(table_stats)
+    if get_connection_pool() is not None:
+        df_stats = load_table_counts().copy()
+        names = df_stats['Table'].str
+        df_stats.insert(1, 'Layer', np.select(
+            [names.startswith('raw'), names.startswith('stg'),
+             names.startswith('rpt'), names.startswith('_')],
+            ['Raw', 'Staging', 'Report', 'System'],
+            default='Other'
+        ))
 
         col1, col2 = st.columns(2)
 
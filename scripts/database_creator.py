@@ -10,6 +10,7 @@ Author: Nevra Donat
 import sqlite3
 import json
 import os
+import sys
 from datetime import datetime
 
 
@@ -77,6 +78,11 @@ def create_database():
     try:
         print(f"\nCreating database: {db_path}")
         conn = sqlite3.connect(db_path)
+
+        # Page size only takes effect before the first table is created;
+        # WAL mode is persistent, so every later connection gets it
+        conn.execute("PRAGMA page_size=8192")
+        conn.execute("PRAGMA journal_mode=WAL")
         cursor = conn.cursor()
 
         # Create metadata table for tracking ETL operations
@@ -153,6 +159,7 @@ def get_database_info():
         return
 
     conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA mmap_size=268435456")
     cursor = conn.cursor()
 
     print("=" * 70)
@@ -194,8 +201,6 @@ def get_database_info():
 
 
 if __name__ == "__main__":
-    import sys
-
     if len(sys.argv) > 1 and sys.argv[1] == '--info':
         get_database_info()
     else:
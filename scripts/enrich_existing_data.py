@@ -17,8 +17,16 @@ Author: Nevra Donat
 import sqlite3
 import json
 import os
-import random
-from datetime import datetime, timedelta
+import pickle
+import sys
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import repeat
+
+import numpy as np
+
+from table_counts import update_table_counts
 
 
 # ============================================================================
@@ -38,9 +46,19 @@ def load_db_config():
 
 
 ROOT = get_project_root()
+BABY_NAMES_FILE = os.path.join(ROOT, 'data', 'Popular_Baby_Names.csv')
+BABY_NAMES_CACHE = os.path.join(ROOT, 'data', 'Popular_Baby_Names.pkl')
 NOW = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+RNG = np.random.default_rng()
 
 LOAN_TYPES = ['personal', 'mortgage', 'auto', 'business']
+# loan_type -> (min principal, max principal, term options in months)
+LOAN_TERMS = {
+    'mortgage': (150000, 800000, [180, 240, 360]),
+    'auto': (15000, 60000, [36, 48, 60, 72]),
+    'business': (50000, 400000, [12, 24, 36, 60]),
+    'personal': (5000, 40000, [12, 24, 36, 48, 60]),
+}
 CARD_TYPES = ['visa', 'mastercard', 'amex']
 ASSET_TYPES = ['stock', 'bond', 'mutual_fund', 'etf']
 SYMBOLS = [
@@ -74,165 +92,308 @@ STREET_NAMES = [
     'Birch Court', 'Willow Way', 'Aspen Circle', 'Spruce Terrace', 'Cypress Path'
 ]
 
+# (table, ID column, ID prefix) for every table the enrichment appends to
+TABLE_KEYS = [
+    ('stgAccountProducts', 'account_id', 'ACC'),
+    ('stgLoans', 'loan_id', 'LOAN'),
+    ('stgCreditCards', 'card_id', 'CARD'),
+    ('stgPendingTransactions', 'transaction_id', 'TXN'),
+    ('stgFailedTransactions', 'transaction_id', 'FTXN'),
+    ('stgInvestments', 'investment_id', 'INV'),
+    ('stgBranches', 'branch_id', 'BR'),
+    ('stgEmployees', 'employee_id', 'EMP'),
+    ('stgAtmLocations', 'atm_id', 'ATM'),
+]
+
+# Rows added per table on each run
+BATCH_SIZES = {
+    'stgBranches': 20,
+    'stgEmployees': 80,
+    'stgAtmLocations': 30,
+    'stgAccountProducts': 500,
+    'stgLoans': 200,
+    'stgCreditCards': 300,
+    'stgPendingTransactions': 400,
+    'stgFailedTransactions': 100,
+    'stgInvestments': 150,
+}
+
+# Threads building row batches for the writer; NumPy's Generator serializes
+# concurrent draws on its own lock, so the workers can share RNG
+BUILD_WORKERS = 2
+
+# Bound parameters per rowid IN (...) lookup (SQLite's default cap is 32766)
+MAX_SQL_PARAMS = 30000
+
 
 # ============================================================================
 # HELPERS
 # ============================================================================
 
-def random_date(start_year=2024, end_year=2026):
-    start = datetime(start_year, 1, 1)
-    end = datetime(end_year, 12, 31)
-    return (start + timedelta(days=random.randint(0, (end - start).days))).strftime("%Y-%m-%d")
+def random_days(n, start_year=2024, end_year=2026):
+    """Draw n random days (datetime64[D]) between Jan 1 of start_year and Dec 31 of end_year."""
+    start = np.datetime64(f"{start_year}-01-01")
+    days = int((np.datetime64(f"{end_year}-12-31") - start).astype(int))
+    return start + RNG.integers(0, days + 1, n)
+
+
+def random_dates(n, start_year=2024, end_year=2026):
+    """Draw n random dates as YYYY-MM-DD strings."""
+    return random_days(n, start_year, end_year).astype(str).tolist()
 
 
-def random_phone():
-    return f"+1-{random.randint(200,999)}-{random.randint(100,999)}-{random.randint(1000,9999)}"
+def monthly_payments(principals, rates, terms):
+    """Annuity payment per loan for arrays of principals, annual % rates and terms in months."""
+    monthly_rates = np.asarray(rates, dtype=np.float64) / 1200.0
+    growth = np.power(1.0 + monthly_rates, -np.asarray(terms, dtype=np.float64))
+    return np.round(principals * monthly_rates / (1.0 - growth), 2)
 
 
-def get_max_id(conn, table, column, prefix):
-    """Get the max numeric ID from a table."""
+def random_phones(n):
+    """Build n random "+1-AAA-MMM-TTTT" phone numbers with NumPy string ops."""
+    areas = RNG.integers(200, 1000, n).astype('U3')
+    mids = RNG.integers(100, 1000, n).astype('U3')
+    tails = RNG.integers(1000, 10000, n).astype('U4')
+    return np.char.add(
+        np.char.add(np.char.add("+1-", areas), np.char.add("-", np.char.add(mids, "-"))),
+        tails
+    ).tolist()
+
+
+@lru_cache(maxsize=1)
+def load_baby_names():
+    """
+    Load unique first names from Popular_Baby_Names.csv (empty list if unavailable).
+    The parsed list is pickled next to the CSV and reused until the CSV changes.
+    """
+    if not os.path.exists(BABY_NAMES_FILE):
+        return []
+    try:
+        if os.path.getmtime(BABY_NAMES_CACHE) >= os.path.getmtime(BABY_NAMES_FILE):
+            with open(BABY_NAMES_CACHE, 'rb') as f:
+                return pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        pass  # no usable cache yet
+
+    import pandas as pd
+    try:
+        names = pd.read_csv(BABY_NAMES_FILE, usecols=['name'], dtype=str)['name']
+    except ValueError:
+        return []
+    names = names.dropna().str.strip()
+    names = sorted(names[names.str.len() >= 2].unique().tolist())
+
+    try:
+        tmp_path = BABY_NAMES_CACHE + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(names, f)
+        os.replace(tmp_path, BABY_NAMES_CACHE)
+    except OSError:
+        pass  # read-only data folder: parse again next run
+    return names
+
+
+def get_max_id(conn, table, column, prefix, after_rowid=0):
+    """Get the max numeric ID from a table, looking only at rows past after_rowid."""
     try:
         cursor = conn.cursor()
-        cursor.execute(f"SELECT MAX(CAST(SUBSTR({column}, {len(prefix)+1}) AS INTEGER)) FROM [{table}]")
+        cursor.execute(
+            f"SELECT MAX(CAST(SUBSTR({column}, {len(prefix)+1}) AS INTEGER)) FROM [{table}] WHERE rowid > ?",
+            (after_rowid,)
+        )
         result = cursor.fetchone()[0]
         return result if result else 0
     except Exception:
         return 0
 
 
-# ============================================================================
-# DATA GENERATORS — insert directly into staging tables
-# ============================================================================
+def load_id_counters(conn):
+    """
+    Get the highest numeric ID per TABLE_KEYS table, kept in _id_counters.
 
-def create_accounts(conn, customer_ids, branch_ids, n=500):
-    """Create new checking/savings accounts with POSITIVE balances for existing customers."""
-    start_id = get_max_id(conn, 'stgAccountProducts', 'account_id', 'ACC')
+    The staging tables are append-only, so only rows added since the last
+    run (rowid above the stored watermark) are scanned. A table with no
+    counter yet, or whose rowids went backwards (rebuilt), is scanned in full.
+    """
     cursor = conn.cursor()
-    new_account_ids = []
-
-    for i in range(1, n + 1):
-        aid = start_id + i
-        acc_type = random.choices(
-            ['checking', 'savings'],
-            weights=[50, 50]
-        )[0]
-
-        if acc_type == 'checking':
-            balance = round(random.uniform(1000, 75000), 2)
-        else:
-            balance = round(random.uniform(5000, 300000), 2)
-
-        account_id = f"ACC{aid:08d}"
-        new_account_ids.append(account_id)
-
-        cursor.execute("""
-            INSERT INTO stgAccountProducts
-            (account_id, customer_id, branch_id, account_type, account_number,
-             balance, currency, opened_date, status, _stg_loaded_at, _stg_source_table)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            account_id,
-            random.choice(customer_ids),
-            random.choice(branch_ids),
-            acc_type,
-            f"****{random.randint(1000, 9999)}",
-            balance,
-            'USD',
-            random_date(2023, 2026),
-            'active',
-            NOW, 'enrichment'
-        ))
-
-    conn.commit()
-    return new_account_ids
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS _id_counters (
+            name TEXT PRIMARY KEY,
+            last_id INTEGER,
+            last_rowid INTEGER,
+            updated_at TEXT
+        )
+    """)
+    cursor.execute("SELECT name, last_id, last_rowid FROM _id_counters")
+    saved = {name: (last_id, last_rowid) for name, last_id, last_rowid in cursor.fetchall()}
+
+    start_ids = {}
+    for table, column, prefix in TABLE_KEYS:
+        last_id, last_rowid = saved.get(table, (0, 0))
+        cursor.execute(f"SELECT COALESCE(MAX(rowid), 0) FROM [{table}]")
+        if cursor.fetchone()[0] < last_rowid:
+            last_id, last_rowid = 0, 0
+        start_ids[table] = max(last_id, get_max_id(conn, table, column, prefix, last_rowid))
+    return start_ids
+
+
+def save_id_counters(conn, last_ids):
+    """Store each table's highest ID and current max rowid in _id_counters."""
+    for table, last_id in last_ids.items():
+        conn.execute(f"""
+            INSERT OR REPLACE INTO _id_counters (name, last_id, last_rowid, updated_at)
+            SELECT ?, ?, COALESCE(MAX(rowid), 0), ? FROM [{table}]
+        """, (table, last_id, NOW))
+
+
+def count_rows(conn, table_names):
+    """Count the rows of several tables in one UNION ALL query. Returns {table: rows}."""
+    cursor = conn.cursor()
+    cursor.execute(" UNION ALL ".join(
+        f"SELECT '{name}', COUNT(*) FROM [{name}]" for name in table_names
+    ))
+    return dict(cursor.fetchall())
 
 
-def create_loans(conn, account_ids, n=200):
-    """Create new active loans."""
-    start_id = get_max_id(conn, 'stgLoans', 'loan_id', 'LOAN')
+def sample_ids(conn, table, column, n):
+    """Draw n random values of a column by rowid, without reading the whole column."""
     cursor = conn.cursor()
+    cursor.execute(f"SELECT COUNT(*), COALESCE(MAX(rowid), 0) FROM [{table}]")
+    total, max_rowid = cursor.fetchone()
+    if total < max_rowid:
+        # Deleted rows left gaps in the rowids; draw from the full column instead
+        cursor.execute(f"SELECT [{column}] FROM [{table}]")
+        pool = np.asarray([row[0] for row in cursor.fetchall()])
+        return pool[RNG.integers(0, len(pool), n)]
+
+    # Staging tables are append-only, so rowids run 1..N; fetch each distinct one once
+    rowids, picks = np.unique(RNG.integers(1, max_rowid + 1, n), return_inverse=True)
+    rowids = rowids.tolist()
+    found = {}
+    for i in range(0, len(rowids), MAX_SQL_PARAMS):
+        chunk = rowids[i:i + MAX_SQL_PARAMS]
+        cursor.execute(
+            f"SELECT rowid, [{column}] FROM [{table}] WHERE rowid IN ({','.join('?' * len(chunk))})",
+            chunk
+        )
+        found.update(cursor.fetchall())
+    return np.asarray([found[rowid] for rowid in rowids])[picks]
+
+
+def split_draws(values, sizes):
+    """Split one array of draws into consecutive parts of the given sizes."""
+    return np.split(values, np.cumsum(sizes)[:-1])
+
+
+def insert_batch(conn, batch):
+    """Insert a (sql, rows) batch returned by one of the build_* functions."""
+    sql, rows = batch
+    conn.executemany(sql, rows)
 
-    for i in range(1, n + 1):
-        lid = start_id + i
-        loan_type = random.choice(LOAN_TYPES)
-
-        if loan_type == 'mortgage':
-            principal = round(random.uniform(150000, 800000), 2)
-            term = random.choice([180, 240, 360])
-        elif loan_type == 'auto':
-            principal = round(random.uniform(15000, 60000), 2)
-            term = random.choice([36, 48, 60, 72])
-        elif loan_type == 'business':
-            principal = round(random.uniform(50000, 400000), 2)
-            term = random.choice([12, 24, 36, 60])
-        else:
-            principal = round(random.uniform(5000, 40000), 2)
-            term = random.choice([12, 24, 36, 48, 60])
-
-        rate = round(random.uniform(3.5, 14.0), 2)
-        monthly = round(principal * (rate / 100 / 12) / (1 - (1 + rate / 100 / 12) ** (-term)), 2)
-        paid_months = random.randint(0, term // 2)
-        outstanding = round(principal * (1 - paid_months / term), 2)
-
-        start = random_date(2023, 2026)
-        start_dt = datetime.strptime(start, "%Y-%m-%d")
-        end_dt = start_dt + timedelta(days=term * 30)
-
-        cursor.execute("""
-            INSERT INTO stgLoans
-            (loan_id, account_id, loan_type, principal, interest_rate, term_months,
-             monthly_payment, outstanding, start_date, end_date, status,
-             _stg_loaded_at, _stg_source_table)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            f"LOAN{lid:06d}",
-            random.choice(account_ids),
-            loan_type,
-            principal, rate, term, monthly, outstanding,
-            start, end_dt.strftime("%Y-%m-%d"),
-            'active',
-            NOW, 'enrichment'
-        ))
 
-    conn.commit()
+# ============================================================================
+# DATA GENERATORS — insert directly into staging tables
+# ============================================================================
+# Numeric columns are drawn and computed as whole NumPy arrays, so there is no
+# per-row arithmetic left to JIT-compile (e.g. with Numba); what remains per
+# row is string formatting, which nopython mode can't speed up.
 
+def create_accounts(conn, customers, branches, start_id, n=500):
+    """Create new checking/savings accounts with POSITIVE balances for existing customers."""
+    new_account_ids = [f"ACC{aid:08d}" for aid in np.arange(start_id + 1, start_id + n + 1).tolist()]
+
+    # Draw all random values for the batch at once
+    is_checking = RNG.random(n) < 0.5
+    acc_types = np.where(is_checking, 'checking', 'savings')
+    balances = np.round(np.where(
+        is_checking,
+        RNG.uniform(1000, 75000, n),
+        RNG.uniform(5000, 300000, n)
+    ), 2)
+    numbers = [f"****{number}" for number in RNG.integers(1000, 10000, n).tolist()]
+    opened = random_dates(n, 2023, 2026)
+
+    conn.executemany("""
+        INSERT INTO stgAccountProducts
+        (account_id, customer_id, branch_id, account_type, account_number,
+         balance, currency, opened_date, status, _stg_loaded_at, _stg_source_table)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, zip(
+        new_account_ids, customers.tolist(), branches.tolist(), acc_types.tolist(),
+        numbers, balances.tolist(), repeat('USD'), opened, repeat('active'),
+        repeat(NOW), repeat('enrichment')
+    ))
+    return new_account_ids
 
-def create_credit_cards(conn, account_ids, n=300):
-    """Create new active credit cards."""
-    start_id = get_max_id(conn, 'stgCreditCards', 'card_id', 'CARD')
-    cursor = conn.cursor()
 
-    for i in range(1, n + 1):
-        cid = start_id + i
-        limit = random.choice([5000, 10000, 15000, 25000, 50000])
-        used = round(random.uniform(0, limit * 0.6), 2)
-
-        cursor.execute("""
-            INSERT INTO stgCreditCards
-            (card_id, account_id, card_number, card_type, credit_limit,
-             available_credit, apr, expiry_date, status,
-             _stg_loaded_at, _stg_source_table)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            f"CARD{cid:06d}",
-            random.choice(account_ids),
-            f"****-****-****-{random.randint(1000, 9999)}",
-            random.choice(CARD_TYPES),
-            limit,
-            round(limit - used, 2),
-            round(random.uniform(12.99, 22.99), 2),
-            f"20{random.randint(27, 31)}-{random.randint(1, 12):02d}",
-            'active',
-            NOW, 'enrichment'
-        ))
+def build_loans(accounts, start_id, n=200):
+    """Build new active loans as a (sql, rows) batch for insert_batch()."""
+    loan_ids = [f"LOAN{lid:06d}" for lid in np.arange(start_id + 1, start_id + n + 1).tolist()]
+
+    # Draw all random values for the batch at once
+    loan_types = RNG.choice(LOAN_TYPES, n)
+    principals = np.empty(n)
+    terms = np.empty(n, dtype=np.int64)
+    for loan_type, (low, high, term_options) in LOAN_TERMS.items():
+        mask = loan_types == loan_type
+        count = int(mask.sum())
+        principals[mask] = RNG.uniform(low, high, count)
+        terms[mask] = RNG.choice(term_options, count)
+    principals = np.round(principals, 2)
+    rates = np.round(RNG.uniform(3.5, 14.0, n), 2)
+    monthly = monthly_payments(principals, rates, terms)
+    paid_months = RNG.integers(0, terms // 2 + 1)
+    outstanding = np.round(principals * (1 - paid_months / terms), 2)
+
+    start_days = random_days(n, 2023, 2026)
+    starts = start_days.astype(str).tolist()
+    ends = (start_days + terms * 30).astype(str).tolist()
+
+    return """
+        INSERT INTO stgLoans
+        (loan_id, account_id, loan_type, principal, interest_rate, term_months,
+         monthly_payment, outstanding, start_date, end_date, status,
+         _stg_loaded_at, _stg_source_table)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, zip(
+        loan_ids, accounts.tolist(), loan_types.tolist(), principals.tolist(),
+        rates.tolist(), terms.tolist(), monthly.tolist(), outstanding.tolist(),
+        starts, ends, repeat('active'), repeat(NOW), repeat('enrichment')
+    )
 
-    conn.commit()
 
+def build_credit_cards(accounts, start_id, n=300):
+    """Build new active credit cards as a (sql, rows) batch for insert_batch()."""
+    card_ids = [f"CARD{cid:06d}" for cid in np.arange(start_id + 1, start_id + n + 1).tolist()]
+
+    # Draw all random values for the batch at once
+    limits = RNG.choice([5000, 10000, 15000, 25000, 50000], n)
+    used = np.round(RNG.uniform(0, limits * 0.6), 2)
+    available = np.round(limits - used, 2)
+    numbers = [f"****-****-****-{number}" for number in RNG.integers(1000, 10000, n).tolist()]
+    card_types = RNG.choice(CARD_TYPES, n)
+    aprs = np.round(RNG.uniform(12.99, 22.99, n), 2)
+    expiry = [
+        f"20{year}-{month:02d}"
+        for year, month in zip(RNG.integers(27, 32, n).tolist(), RNG.integers(1, 13, n).tolist())
+    ]
+
+    return """
+        INSERT INTO stgCreditCards
+        (card_id, account_id, card_number, card_type, credit_limit,
+         available_credit, apr, expiry_date, status,
+         _stg_loaded_at, _stg_source_table)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, zip(
+        card_ids, accounts.tolist(), numbers, card_types.tolist(), limits.tolist(),
+        available.tolist(), aprs.tolist(), expiry, repeat('active'),
+        repeat(NOW), repeat('enrichment')
+    )
 
-def create_pending_transactions(conn, account_ids, n=400):
-    """Create new pending transactions for existing and new accounts."""
-    start_id = get_max_id(conn, 'stgPendingTransactions', 'transaction_id', 'TXN')
-    cursor = conn.cursor()
+
+def build_pending_transactions(accounts, start_id, n=400):
+    """Build new pending transactions (existing and new accounts) as a (sql, rows) batch."""
+    txn_ids = [f"TXN{tid:08d}" for tid in np.arange(start_id + 1, start_id + n + 1).tolist()]
 
     descriptions_credit = [
         'Direct Deposit - Payroll', 'Wire Transfer In', 'Deposit - Ref#{}',
@@ -246,153 +407,138 @@ def create_pending_transactions(conn, account_ids, n=400):
         'Subscription Payment', 'Mortgage Payment', 'Rent Payment',
         'Grocery Store', 'Gas Station', 'Restaurant'
     ]
-
-    for i in range(1, n + 1):
-        tid = start_id + i
-        txn_type = random.choice(['credit', 'debit'])
-        amount = round(random.uniform(25, 8000), 2)
-        created = datetime.now() - timedelta(days=random.randint(0, 5))
-        expected = created + timedelta(days=random.randint(1, 3))
-
-        if txn_type == 'credit':
-            desc = random.choice(descriptions_credit).format(random.randint(10000, 99999))
-        else:
-            desc = random.choice(descriptions_debit).format(random.randint(10000, 99999))
-
-        cursor.execute("""
-            INSERT INTO stgPendingTransactions
-            (transaction_id, account_id, amount, currency, transaction_type,
-             description, status, created_date, expected_clear,
-             _stg_loaded_at, _stg_source_table)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            f"TXN{tid:08d}",
-            random.choice(account_ids),
-            amount if txn_type == 'credit' else -amount,
-            'USD',
-            txn_type,
-            desc,
-            random.choice(['pending', 'processing']),
-            created.strftime("%Y-%m-%d %H:%M:%S"),
-            expected.strftime("%Y-%m-%d"),
-            NOW, 'enrichment'
-        ))
-
-    conn.commit()
-
-
-def create_failed_transactions(conn, account_ids, n=100):
-    """Create new failed transactions."""
-    start_id = get_max_id(conn, 'stgFailedTransactions', 'transaction_id', 'FTXN')
-    cursor = conn.cursor()
-
-    for i in range(1, n + 1):
-        fid = start_id + i
-        err_code = random.choice(list(ERROR_CODES.keys()))
-
-        cursor.execute("""
-            INSERT INTO stgFailedTransactions
-            (transaction_id, account_id, amount, currency, transaction_type,
-             error_code, error_message, attempted_date, merchant,
-             _stg_loaded_at, _stg_source_table)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            f"FTXN{fid:07d}",
-            random.choice(account_ids),
-            round(random.uniform(20, 3000), 2),
-            'USD', 'debit',
-            err_code, ERROR_CODES[err_code],
-            random_date(2025, 2026),
-            random.choice(MERCHANTS),
-            NOW, 'enrichment'
-        ))
-
-    conn.commit()
+    # (template, needs a reference number) per transaction type
+    templates = {
+        'credit': [(d, '{}' in d) for d in descriptions_credit],
+        'debit': [(d, '{}' in d) for d in descriptions_debit],
+    }
+
+    # Draw all random values for the batch at once
+    txn_types = RNG.choice(['credit', 'debit'], n)
+    desc_idx = RNG.integers(0, np.where(
+        txn_types == 'credit', len(descriptions_credit), len(descriptions_debit)
+    ))
+    refs = RNG.integers(10000, 100000, n)
+    amounts = np.round(RNG.uniform(25, 8000, n), 2)
+    amounts = np.where(txn_types == 'credit', amounts, -amounts)
+    statuses = RNG.choice(['pending', 'processing'], n)
+
+    descs = []
+    for txn_type, i, ref in zip(txn_types.tolist(), desc_idx.tolist(), refs.tolist()):
+        template, has_ref = templates[txn_type][i]
+        descs.append(template.format(ref) if has_ref else template)
+
+    # Created 0-5 days before this run, expected to clear 1-3 days later
+    created = np.datetime64(NOW) - RNG.integers(0, 6, n).astype('timedelta64[D]')
+    expected = (created.astype('datetime64[D]') + RNG.integers(1, 4, n)).astype(str).tolist()
+    created = np.char.replace(created.astype(str), 'T', ' ').tolist()
+
+    return """
+        INSERT INTO stgPendingTransactions
+        (transaction_id, account_id, amount, currency, transaction_type,
+         description, status, created_date, expected_clear,
+         _stg_loaded_at, _stg_source_table)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, zip(
+        txn_ids, accounts.tolist(), amounts.tolist(), repeat('USD'), txn_types.tolist(),
+        descs, statuses.tolist(), created, expected, repeat(NOW), repeat('enrichment')
+    )
 
 
-def create_investments(conn, account_ids, n=150):
-    """Create new investments."""
-    start_id = get_max_id(conn, 'stgInvestments', 'investment_id', 'INV')
-    cursor = conn.cursor()
+def build_failed_transactions(accounts, start_id, n=100):
+    """Build new failed transactions as a (sql, rows) batch for insert_batch()."""
+    txn_ids = [f"FTXN{fid:07d}" for fid in np.arange(start_id + 1, start_id + n + 1).tolist()]
+
+    # Draw all random values for the batch at once
+    err_codes = RNG.choice(list(ERROR_CODES), n).tolist()
+    amounts = np.round(RNG.uniform(20, 3000, n), 2)
+    merchants = RNG.choice(MERCHANTS, n)
+    attempted = random_dates(n, 2025, 2026)
+
+    return """
+        INSERT INTO stgFailedTransactions
+        (transaction_id, account_id, amount, currency, transaction_type,
+         error_code, error_message, attempted_date, merchant,
+         _stg_loaded_at, _stg_source_table)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, zip(
+        txn_ids, accounts.tolist(), amounts.tolist(), repeat('USD'), repeat('debit'),
+        err_codes, [ERROR_CODES[code] for code in err_codes], attempted,
+        merchants.tolist(), repeat(NOW), repeat('enrichment')
+    )
 
-    for i in range(1, n + 1):
-        iid = start_id + i
-        symbol = random.choice(SYMBOLS)
-        qty = round(random.uniform(5, 500), 2)
-        purchase = round(random.uniform(50, 500), 2)
-        current = round(purchase * random.uniform(0.8, 1.4), 2)
-
-        cursor.execute("""
-            INSERT INTO stgInvestments
-            (investment_id, account_id, asset_type, symbol, quantity,
-             purchase_price, current_price, current_value, purchase_date,
-             _stg_loaded_at, _stg_source_table)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            f"INV{iid:06d}",
-            random.choice(account_ids),
-            random.choice(ASSET_TYPES),
-            symbol, qty, purchase, current,
-            round(qty * current, 2),
-            random_date(2024, 2026),
-            NOW, 'enrichment'
-        ))
 
-    conn.commit()
+def build_investments(accounts, start_id, n=150):
+    """Build new investments as a (sql, rows) batch for insert_batch()."""
+    investment_ids = [f"INV{iid:06d}" for iid in np.arange(start_id + 1, start_id + n + 1).tolist()]
+
+    # Draw all random values for the batch at once
+    symbols = RNG.choice(SYMBOLS, n)
+    quantities = np.round(RNG.uniform(5, 500, n), 2)
+    purchases = np.round(RNG.uniform(50, 500, n), 2)
+    currents = np.round(purchases * RNG.uniform(0.8, 1.4, n), 2)
+    values = np.round(quantities * currents, 2)
+    asset_types = RNG.choice(ASSET_TYPES, n)
+    purchased = random_dates(n, 2024, 2026)
+
+    return """
+        INSERT INTO stgInvestments
+        (investment_id, account_id, asset_type, symbol, quantity,
+         purchase_price, current_price, current_value, purchase_date,
+         _stg_loaded_at, _stg_source_table)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, zip(
+        investment_ids, accounts.tolist(), asset_types.tolist(), symbols.tolist(),
+        quantities.tolist(), purchases.tolist(), currents.tolist(), values.tolist(),
+        purchased, repeat(NOW), repeat('enrichment')
+    )
 
 
-def create_branches(conn, n=20):
+def create_branches(conn, start_id, n=20):
     """Create new branches."""
-    start_id = get_max_id(conn, 'stgBranches', 'branch_id', 'BR')
     cursor = conn.cursor()
-    new_branch_ids = []
-
-    for i in range(1, n + 1):
-        bid = start_id + i
-        city_idx = random.randint(0, len(CITIES) - 1)
-        branch_id = f"BR{bid:03d}"
-        new_branch_ids.append(branch_id)
-
-        cursor.execute("""
-            INSERT INTO stgBranches
-            (branch_id, branch_name, address, city, state, postal_code,
-             phone, hours, services, _stg_loaded_at, _stg_source_table)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+    rows = []
+    branch_nums = np.arange(start_id + 1, start_id + n + 1).tolist()
+    new_branch_ids = [f"BR{bid:03d}" for bid in branch_nums]
+
+    # Draw each column for the batch at once
+    city_idxs = RNG.integers(0, len(CITIES), n).tolist()
+    street_nums = RNG.integers(100, 10000, n).tolist()
+    streets = RNG.choice(STREET_NAMES, n).tolist()
+    postal_codes = RNG.integers(10000, 100000, n).tolist()
+    phones = random_phones(n)
+
+    for bid, branch_id, city_idx, street_num, street, postal_code, phone in zip(
+        branch_nums, new_branch_ids, city_idxs, street_nums, streets, postal_codes, phones
+    ):
+        rows.append((
             branch_id,
             f"{CITIES[city_idx]} Branch {bid}",
-            f"{random.randint(100, 9999)} {random.choice(STREET_NAMES)}",
+            f"{street_num} {street}",
             CITIES[city_idx], STATES[city_idx],
-            random.randint(10000, 99999),
-            random_phone(),
+            postal_code,
+            phone,
             "Mon-Fri 9AM-5PM, Sat 9AM-1PM",
             "deposits,withdrawals,loans,investments",
             NOW, 'enrichment'
         ))
 
-    conn.commit()
+    cursor.executemany("""
+        INSERT INTO stgBranches
+        (branch_id, branch_name, address, city, state, postal_code,
+         phone, hours, services, _stg_loaded_at, _stg_source_table)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, rows)
     return new_branch_ids
 
 
-def create_employees(conn, branch_ids, n=80):
+def create_employees(conn, branches, start_id, n=80):
     """Create new employees for branches."""
-    start_id = get_max_id(conn, 'stgEmployees', 'employee_id', 'EMP')
     cursor = conn.cursor()
+    rows = []
 
     # Load baby names if available
-    baby_names_file = os.path.join(ROOT, 'data', 'Popular_Baby_Names.csv')
-    names = []
-    if os.path.exists(baby_names_file):
-        import csv
-        with open(baby_names_file, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            name_set = set()
-            for row in reader:
-                name = row.get('name', '').strip()
-                if name and len(name) >= 2:
-                    name_set.add(name)
-            names = list(name_set)
-
+    names = load_baby_names()
     if not names:
         names = ['Alex', 'Jordan', 'Morgan', 'Taylor', 'Casey', 'Riley', 'Quinn', 'Harper']
 
@@ -402,61 +548,84 @@ def create_employees(conn, branch_ids, n=80):
         'Taylor', 'Moore', 'Jackson', 'Lee', 'Thompson', 'White', 'Harris'
     ]
 
-    for i in range(1, n + 1):
-        eid = start_id + i
-        first = random.choice(names)
-        last = random.choice(last_names)
-
-        cursor.execute("""
-            INSERT INTO stgEmployees
-            (employee_id, branch_id, name, role, email, phone, hire_date, status,
-             _stg_loaded_at, _stg_source_table)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            f"EMP{eid:05d}",
-            random.choice(branch_ids),
+    employee_ids = [f"EMP{eid:05d}" for eid in np.arange(start_id + 1, start_id + n + 1).tolist()]
+    hired = random_dates(n, 2020, 2026)
+
+    firsts = RNG.choice(names, n).tolist()
+    lasts = RNG.choice(last_names, n).tolist()
+    roles = RNG.choice(ROLES, n).tolist()
+    statuses = RNG.choice(['active', 'on_leave'], n, p=[0.92, 0.08]).tolist()
+    emails = np.char.add(
+        np.char.add(np.char.lower(firsts), "."),
+        np.char.add(np.char.lower(lasts), "@bank.com")
+    ).tolist()
+    phones = random_phones(n)
+
+    for employee_id, branch_id, hire_date, first, last, role, status, email, phone in zip(
+        employee_ids, branches.tolist(), hired, firsts, lasts, roles, statuses, emails, phones
+    ):
+        rows.append((
+            employee_id,
+            branch_id,
             f"{first} {last}",
-            random.choice(ROLES),
-            f"{first.lower()}.{last.lower()}@bank.com",
-            random_phone(),
-            random_date(2020, 2026),
-            random.choices(['active', 'on_leave'], weights=[92, 8])[0],
+            role,
+            email,
+            phone,
+            hire_date,
+            status,
             NOW, 'enrichment'
         ))
 
-    conn.commit()
+    cursor.executemany("""
+        INSERT INTO stgEmployees
+        (employee_id, branch_id, name, role, email, phone, hire_date, status,
+         _stg_loaded_at, _stg_source_table)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, rows)
 
 
-def create_atm_locations(conn, branch_ids, n=30):
+def create_atm_locations(conn, branches, start_id, n=30):
     """Create new ATM locations."""
-    start_id = get_max_id(conn, 'stgAtmLocations', 'atm_id', 'ATM')
     cursor = conn.cursor()
-
-    for i in range(1, n + 1):
-        aid = start_id + i
-        city_idx = random.randint(0, len(CITIES) - 1)
-
-        cursor.execute("""
-            INSERT INTO stgAtmLocations
-            (atm_id, branch_id, address, city, latitude, longitude,
-             available_24h, withdrawal_fee, deposit_enabled, status,
-             _stg_loaded_at, _stg_source_table)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            f"ATM{aid:04d}",
-            random.choice(branch_ids),
-            f"{random.randint(100, 9999)} {random.choice(STREET_NAMES)}",
-            CITIES[city_idx],
-            round(random.uniform(25.0, 48.0), 6),
-            round(random.uniform(-122.0, -71.0), 6),
-            random.choice([0, 1]),
-            round(random.choice([0, 2.5, 3.0, 3.5]), 2),
-            random.choice([0, 1]),
+    rows = []
+
+    atm_ids = [f"ATM{aid:04d}" for aid in np.arange(start_id + 1, start_id + n + 1).tolist()]
+
+    # Draw each column for the batch at once
+    cities = RNG.choice(CITIES, n).tolist()
+    street_nums = RNG.integers(100, 10000, n).tolist()
+    streets = RNG.choice(STREET_NAMES, n).tolist()
+    open_24h = RNG.integers(0, 2, n).tolist()
+    fees = RNG.choice([0, 2.5, 3.0, 3.5], n).tolist()
+    deposits = RNG.integers(0, 2, n).tolist()
+    latitudes = np.round(RNG.uniform(25.0, 48.0, n), 6).tolist()
+    longitudes = np.round(RNG.uniform(-122.0, -71.0, n), 6).tolist()
+
+    for atm_id, branch_id, city, street_num, street, lat, lon, is_24h, fee, deposit in zip(
+        atm_ids, branches.tolist(), cities, street_nums, streets,
+        latitudes, longitudes, open_24h, fees, deposits
+    ):
+        rows.append((
+            atm_id,
+            branch_id,
+            f"{street_num} {street}",
+            city,
+            lat,
+            lon,
+            is_24h,
+            fee,
+            deposit,
             'operational',
             NOW, 'enrichment'
         ))
 
-    conn.commit()
+    cursor.executemany("""
+        INSERT INTO stgAtmLocations
+        (atm_id, branch_id, address, city, latitude, longitude,
+         available_24h, withdrawal_fee, deposit_enabled, status,
+         _stg_loaded_at, _stg_source_table)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, rows)
 
 
 # ============================================================================
@@ -478,21 +647,16 @@ def main():
         return
 
     conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-65536")
     cursor = conn.cursor()
 
     # Get existing data
     print(f"\nDatabase: {db_path}")
     print("\nReading existing data...")
 
-    cursor.execute("SELECT customer_id FROM stgCustomerProfiles")
-    customer_ids = [row[0] for row in cursor.fetchall()]
-
-    cursor.execute("SELECT account_id FROM stgAccountProducts")
-    existing_account_ids = [row[0] for row in cursor.fetchall()]
-
-    cursor.execute("SELECT branch_id FROM stgBranches")
-    existing_branch_ids = [row[0] for row in cursor.fetchall()]
-
     # Current counts
     tables_info = [
         ('stgCustomerProfiles', 'Customers'),
@@ -508,62 +672,94 @@ def main():
     ]
 
     print("\n  BEFORE:")
-    before_counts = {}
+    before_counts = count_rows(conn, [table for table, _ in tables_info])
     for table, label in tables_info:
-        cursor.execute(f"SELECT COUNT(*) FROM [{table}]")
-        count = cursor.fetchone()[0]
-        before_counts[table] = count
-        print(f"    {label}: {count:,}")
+        print(f"    {label}: {before_counts[table]:,}")
 
     cursor.execute("SELECT COALESCE(SUM(balance), 0) FROM stgAccountProducts")
     balance_before = cursor.fetchone()[0]
     print(f"    Total Balance: ${balance_before:,.2f}")
 
-    # Generate new data
+    # Generate new data in one write transaction (a single commit/fsync)
     print("\nGenerating new data for existing customers...")
+    conn.execute("BEGIN IMMEDIATE")
+
+    # Highest existing ID per table, looked up once under the write lock
+    start_ids = load_id_counters(conn)
 
     # 1. New branches + employees + ATMs
     print("\n  [1/7] Creating new branches...")
-    new_branch_ids = create_branches(conn, n=20)
-    all_branch_ids = existing_branch_ids + new_branch_ids
-    print(f"         +20 branches")
+    create_branches(conn, start_ids['stgBranches'], n=BATCH_SIZES['stgBranches'])
+    print(f"         +{BATCH_SIZES['stgBranches']} branches")
+
+    # Random customer/branch/account IDs are drawn by rowid (the new rows are
+    # already visible inside this transaction) rather than loading every ID
+    employee_branches, atm_branches, account_branches = split_draws(
+        sample_ids(conn, 'stgBranches', 'branch_id',
+                   BATCH_SIZES['stgEmployees'] + BATCH_SIZES['stgAtmLocations'] + BATCH_SIZES['stgAccountProducts']),
+        [BATCH_SIZES['stgEmployees'], BATCH_SIZES['stgAtmLocations'], BATCH_SIZES['stgAccountProducts']]
+    )
 
     print("  [2/7] Creating new employees...")
-    create_employees(conn, all_branch_ids, n=80)
-    print(f"         +80 employees")
+    create_employees(conn, employee_branches, start_ids['stgEmployees'], n=BATCH_SIZES['stgEmployees'])
+    print(f"         +{BATCH_SIZES['stgEmployees']} employees")
 
     print("  [3/7] Creating new ATM locations...")
-    create_atm_locations(conn, all_branch_ids, n=30)
-    print(f"         +30 ATMs")
+    create_atm_locations(conn, atm_branches, start_ids['stgAtmLocations'], n=BATCH_SIZES['stgAtmLocations'])
+    print(f"         +{BATCH_SIZES['stgAtmLocations']} ATMs")
 
     # 2. New accounts for existing customers (positive balances)
     print("  [4/7] Creating new accounts (checking/savings)...")
-    new_account_ids = create_accounts(conn, customer_ids, all_branch_ids, n=500)
-    all_account_ids = existing_account_ids + new_account_ids
-    print(f"         +500 accounts")
-
-    # 3. New loans (active)
-    print("  [5/7] Creating new active loans...")
-    create_loans(conn, all_account_ids, n=200)
-    print(f"         +200 active loans")
-
-    # 4. New credit cards (active)
-    print("  [6/7] Creating new credit cards...")
-    create_credit_cards(conn, all_account_ids, n=300)
-    print(f"         +300 credit cards")
-
-    # 5. Transactions + investments
-    print("  [7/7] Creating transactions & investments...")
-    create_pending_transactions(conn, all_account_ids, n=400)
-    create_failed_transactions(conn, all_account_ids, n=100)
-    create_investments(conn, all_account_ids, n=150)
-    print(f"         +400 pending txns, +100 failed txns, +150 investments")
+    customers = sample_ids(conn, 'stgCustomerProfiles', 'customer_id', BATCH_SIZES['stgAccountProducts'])
+    create_accounts(conn, customers, account_branches, start_ids['stgAccountProducts'], n=BATCH_SIZES['stgAccountProducts'])
+    print(f"         +{BATCH_SIZES['stgAccountProducts']} accounts")
+
+    # 3-5. Loans, cards, transactions and investments only need account IDs
+    # (drawn up front in one lookup), so their rows are built in worker threads while this thread - the
+    # only one using the connection - writes each finished batch in order
+    builders = [
+        ('stgLoans', build_loans),
+        ('stgCreditCards', build_credit_cards),
+        ('stgPendingTransactions', build_pending_transactions),
+        ('stgFailedTransactions', build_failed_transactions),
+        ('stgInvestments', build_investments),
+    ]
+    account_draws = split_draws(
+        sample_ids(conn, 'stgAccountProducts', 'account_id', sum(BATCH_SIZES[table] for table, _ in builders)),
+        [BATCH_SIZES[table] for table, _ in builders]
+    )
+    with ThreadPoolExecutor(max_workers=BUILD_WORKERS) as pool:
+        batches = {
+            table: pool.submit(build, accounts, start_ids[table], BATCH_SIZES[table])
+            for (table, build), accounts in zip(builders, account_draws)
+        }
+
+        # 3. New loans (active)
+        print("  [5/7] Creating new active loans...")
+        insert_batch(conn, batches['stgLoans'].result())
+        print(f"         +{BATCH_SIZES['stgLoans']} active loans")
+
+        # 4. New credit cards (active)
+        print("  [6/7] Creating new credit cards...")
+        insert_batch(conn, batches['stgCreditCards'].result())
+        print(f"         +{BATCH_SIZES['stgCreditCards']} credit cards")
+
+        # 5. Transactions + investments
+        print("  [7/7] Creating transactions & investments...")
+        insert_batch(conn, batches['stgPendingTransactions'].result())
+        insert_batch(conn, batches['stgFailedTransactions'].result())
+        insert_batch(conn, batches['stgInvestments'].result())
+        print(f"         +{BATCH_SIZES['stgPendingTransactions']} pending txns, "
+              f"+{BATCH_SIZES['stgFailedTransactions']} failed txns, "
+              f"+{BATCH_SIZES['stgInvestments']} investments")
+    save_id_counters(conn, {table: start_ids[table] + n for table, n in BATCH_SIZES.items()})
+    conn.commit()
 
     # After counts
     print("\n  AFTER:")
+    after_counts = count_rows(conn, [table for table, _ in tables_info])
     for table, label in tables_info:
-        cursor.execute(f"SELECT COUNT(*) FROM [{table}]")
-        count = cursor.fetchone()[0]
+        count = after_counts[table]
         diff = count - before_counts[table]
         print(f"    {label}: {count:,} (+{diff:,})")
 
@@ -572,6 +768,9 @@ def main():
     balance_diff = balance_after - balance_before
     print(f"    Total Balance: ${balance_after:,.2f} (+${balance_diff:,.2f})")
 
+    # Refresh the dashboard's cached row counts of the enriched tables
+    update_table_counts(conn, list(after_counts) + ['_id_counters'], after_counts)
+
     conn.close()
 
     # Now refresh reports
@@ -580,13 +779,18 @@ def main():
     print(f"{'=' * 70}")
     print("\nRefreshing report tables...")
 
-    import subprocess, sys
-    result = subprocess.run(
-        [sys.executable, os.path.join(ROOT, 'scripts', 'stg_to_rpt.py')],
-        cwd=ROOT
-    )
-
-    if result.returncode == 0:
+    # Run the report refresh in this process instead of starting a new interpreter
+    try:
+        scripts_dir = os.path.dirname(os.path.abspath(__file__))
+        if scripts_dir not in sys.path:
+            sys.path.insert(0, scripts_dir)
+        import stg_to_rpt
+        refreshed = stg_to_rpt.main()
+    except Exception as e:
+        print(f"\nERROR refreshing reports: {str(e)}")
+        refreshed = False
+
+    if refreshed:
         print(f"\n{'=' * 70}")
         print("ALL DONE - Dashboard KPIs updated!")
         print(f"{'=' * 70}")
@@ -7,16 +7,21 @@ Also creates transactions for EXISTING accounts from the database.
 
 Usage:
     python scripts/generate_new_data.py
+    SEED=42 python scripts/generate_new_data.py    (reproducible random data)
 
 Author: Nevra Donat
 """
 
 import csv
 import os
-import random
+import pickle
 import sqlite3
 import json
-from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from itertools import islice, repeat
+
+import numpy as np
 
 
 # ============================================================================
@@ -38,7 +43,13 @@ def load_db_config():
 ROOT = get_project_root()
 INCOMING_FOLDER = os.path.normpath(os.path.join(ROOT, 'data', 'incoming'))
 BABY_NAMES_FILE = os.path.normpath(os.path.join(ROOT, 'data', 'Popular_Baby_Names.csv'))
+# Parsed first names, shared with enrich_existing_data.py
+BABY_NAMES_CACHE = os.path.normpath(os.path.join(ROOT, 'data', 'Popular_Baby_Names.pkl'))
 DATE_STR = datetime.now().strftime("%Y%m%d")
+RNG = np.random.default_rng()
+CSV_CHUNK_ROWS = 1000  # rows handed to csv.writer per writerows() call
+CSV_BUFFER_BYTES = 1 << 20  # write buffer per CSV file, so a file is flushed in few writes
+GENERATOR_WORKERS = os.cpu_count() or 1
 
 
 # --------------------------------------------------------------------------
@@ -54,20 +65,34 @@ def load_baby_names():
             'Felix', 'Anya', 'Rafael', 'Marco', 'Nora', 'Leo','Nevra'
         ]
 
-    names = set()
-    with open(BABY_NAMES_FILE, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            name = row.get('name', '').strip()
-            if name and len(name) >= 2:
-                names.add(name)
+    # Reuse the pickled list from a previous run while the CSV is unchanged
+    try:
+        if os.path.getmtime(BABY_NAMES_CACHE) >= os.path.getmtime(BABY_NAMES_FILE):
+            with open(BABY_NAMES_CACHE, 'rb') as f:
+                return pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        pass  # no usable cache yet
+
+    import pandas as pd
+    names = pd.read_csv(BABY_NAMES_FILE, usecols=['name'], dtype=str)['name']
+    names = names.dropna().str.strip()
+    names = sorted(names[names.str.len() >= 2].unique().tolist())
 
-    return sorted(names)
+    try:
+        tmp_path = BABY_NAMES_CACHE + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(names, f)
+        os.replace(tmp_path, BABY_NAMES_CACHE)
+    except OSError:
+        pass  # read-only data folder: parse again next run
+    return names
 
 
-FIRST_NAMES = load_baby_names()
+# Value lists are NumPy arrays so the generators can draw from and index
+# them directly, without converting a list on every call
+FIRST_NAMES = np.asarray(load_baby_names())
 
-LAST_NAMES = [
+LAST_NAMES = np.array([
     'Nakamura', 'Okafor', 'Petrov', 'Svensson', 'Al-Rashid', 'Moreau',
     'Kowalski', 'Fernandez', 'Yamamoto', 'Ibrahim', 'Johansson', 'Dubois',
     'Khatri', 'Volkov', 'Mendoza', 'Takahashi', 'Osei', 'Lindqvist',
@@ -75,34 +100,44 @@ LAST_NAMES = [
     'Almeida', 'Kozlov', 'Tanaka', 'Okonkwo', 'Ericsson', 'Rivera',
     'Sharma', 'Ivanov', 'Kimura', 'Adeyemi', 'Larsson', 'Santos',
     'Gupta', 'Sorokin', 'Watanabe', 'Mensah', 'Nilsson', 'Costa'
-]
+])
 
-CITIES = [
+CITIES = np.array([
     'Miami', 'Atlanta', 'Minneapolis', 'Nashville', 'Sacramento',
     'Las Vegas', 'Baltimore', 'Milwaukee', 'Tampa', 'Orlando',
     'Raleigh', 'Pittsburgh', 'Cincinnati', 'Kansas City', 'Cleveland',
     'Salt Lake City', 'Richmond', 'Memphis', 'Louisville', 'Tucson'
-]
+])
 
-STATES = [
+STATES = np.array([
     'FL', 'GA', 'MN', 'TN', 'CA',
     'NV', 'MD', 'WI', 'FL', 'FL',
     'NC', 'PA', 'OH', 'MO', 'OH',
     'UT', 'VA', 'TN', 'KY', 'AZ'
-]
+])
 
-STREET_NAMES = [
+STREET_NAMES = np.array([
     'Oak Avenue', 'Maple Drive', 'Cedar Lane', 'Pine Road', 'Elm Boulevard',
     'Birch Court', 'Willow Way', 'Aspen Circle', 'Spruce Terrace', 'Cypress Path',
     'Redwood Place', 'Magnolia Street', 'Chestnut Lane', 'Hickory Drive', 'Poplar Road'
-]
-
-SEGMENTS = ['retail', 'premium', 'private', 'business']
-RISK_RATINGS = ['low', 'medium', 'high']
-ACCOUNT_TYPES = ['checking', 'savings', 'credit', 'loan']
-LOAN_TYPES = ['personal', 'mortgage', 'auto', 'business']
-CARD_TYPES = ['visa', 'mastercard', 'amex']
-ASSET_TYPES = ['stock', 'bond', 'mutual_fund', 'etf']
+])
+
+SEGMENTS = np.array(['retail', 'premium', 'private', 'business'])
+RISK_RATINGS = np.array(['low', 'medium', 'high'])
+ACCOUNT_TYPES = np.array(['checking', 'savings', 'credit', 'loan'])
+# Balance range per account type, in ACCOUNT_TYPES order
+BALANCE_LOW = np.array([100, 1000, -10000, -500000])
+BALANCE_HIGH = np.array([50000, 200000, 0, -10000])
+LOAN_TYPES = np.array(['personal', 'mortgage', 'auto', 'business'])
+# Principal range and term options (months) per loan type
+LOAN_TERMS = {
+    'personal': (5000, 50000, [12, 24, 36, 48, 60]),
+    'mortgage': (100000, 1000000, [180, 240, 360]),
+    'auto': (10000, 80000, [36, 48, 60, 72]),
+    'business': (50000, 500000, [12, 24, 36, 60]),
+}
+CARD_TYPES = np.array(['visa', 'mastercard', 'amex'])
+ASSET_TYPES = np.array(['stock', 'bond', 'mutual_fund', 'etf'])
 ERROR_CODES = {
     'E001': 'Insufficient funds',
     'E002': 'Card declined',
@@ -110,50 +145,140 @@ ERROR_CODES = {
     'E004': 'Expired card',
     'E005': 'Fraud suspected'
 }
-MERCHANTS = [
+MERCHANTS = np.array([
     'Whole Foods', 'Home Depot', 'Starbucks', 'Netflix', 'Uber',
     'Apple Store', 'Nike', 'Trader Joes', 'Shell Gas', 'Spotify',
     'Walgreens', 'Chipotle', 'Delta Airlines', 'Airbnb', 'Lyft'
-]
-SYMBOLS = [
+])
+SYMBOLS = np.array([
     'AAPL', 'GOOGL', 'MSFT', 'AMZN', 'TSLA', 'META', 'NVDA', 'AMD',
     'NFLX', 'DIS', 'PYPL', 'SQ', 'SHOP', 'COIN', 'PLTR',
     'BND', 'AGG', 'TLT', 'VFIAX', 'SPY', 'QQQ', 'VTI', 'IWM', 'VOO'
-]
-ROLES = ['Teller', 'Manager', 'Loan Officer', 'Customer Service', 'Financial Advisor']
+])
+ROLES = np.array(['Teller', 'Manager', 'Loan Officer', 'Customer Service', 'Financial Advisor'])
+CREDIT_LIMITS = np.array([1000, 2500, 5000, 10000, 15000, 25000, 50000], dtype=np.int32)
+WITHDRAWAL_FEES = np.array([0, 2.5, 3.0, 3.5])
+EMAIL_DOMAINS = np.array(['gmail.com', 'yahoo.com', 'outlook.com', 'protonmail.com', 'icloud.com'])
+# Pending-transaction descriptions; entries ending in "Ref#" get a 5-digit reference appended
+DESCRIPTIONS_CREDIT = np.array([
+    'Direct Deposit - Payroll', 'Wire Transfer In', 'Deposit - Ref#',
+    'ACH Credit - Refund', 'Mobile Deposit', 'Transfer In - Savings',
+    'Interest Payment', 'Cashback Reward'
+])
+DESCRIPTIONS_DEBIT = np.array([
+    'Payment - Ref#', 'Bill Pay - Utilities', 'ACH Debit - Insurance',
+    'Wire Transfer Out', 'Online Purchase', 'Transfer Out - Checking',
+    'Subscription Payment', 'Mortgage Payment', 'Rent Payment'
+])
+
+# Weighted enum columns as (values, cumulative weights), drawn with weighted_pick()
+CUSTOMER_STATUS = (['active', 'inactive', 'closed'], [85, 95, 100])
+ACCOUNT_STATUS = (['active', 'dormant', 'closed'], [90, 97, 100])
+CURRENCY = (['USD', 'EUR'], [85, 100])
+LOAN_STATUS = (['active', 'paid_off', 'defaulted'], [70, 95, 100])
+CARD_STATUS = (['active', 'blocked', 'expired'], [90, 95, 100])
+EMPLOYEE_STATUS = (['active', 'on_leave', 'terminated'], [90, 97, 100])
+ATM_STATUS = (['operational', 'maintenance', 'offline'], [90, 97, 100])
+TXN_STATUS = (['pending', 'processing'], [50, 100])
 
 
 # ============================================================================
 # HELPERS
 # ============================================================================
 
-def random_date(start_year=2024, end_year=2026):
-    """Generate random date string."""
-    start = datetime(start_year, 1, 1)
-    end = datetime(end_year, 12, 31)
-    delta = end - start
-    return (start + timedelta(days=random.randint(0, delta.days))).strftime("%Y-%m-%d")
+def random_days(n, start_year=2024, end_year=2026):
+    """Draw n random days (datetime64[D]) between Jan 1 of start_year and Dec 31 of end_year."""
+    start = np.datetime64(f"{start_year}-01-01")
+    days = int((np.datetime64(f"{end_year}-12-31") - start).astype(int))
+    return start + RNG.integers(0, days + 1, n)
+
+
+def random_dates(n, start_year=2024, end_year=2026):
+    """Draw n random date strings at once."""
+    return random_days(n, start_year, end_year).astype(str).tolist()
+
+
+def weighted_pick(column, n):
+    """Draw n values of a (values, cumulative weights) column by binary search over its CDF."""
+    values, cum_weights = column
+    cdf = np.asarray(cum_weights) / cum_weights[-1]
+    return np.asarray(values)[np.searchsorted(cdf, RNG.random(n), side='right')].tolist()
+
+
+def pick_ids(ids, n):
+    """Draw n IDs (with replacement) from a list with one NumPy integer-index draw."""
+    ids = np.asarray(ids)
+    return ids[RNG.integers(0, ids.size, n)].tolist()
+
 
+def format_ids(prefix, start_id, n, width):
+    """Build n sequential IDs (prefix + zero-padded number) with NumPy string ops."""
+    numbers = np.arange(start_id + 1, start_id + n + 1).astype(str)
+    return np.char.add(prefix, np.char.zfill(numbers, width)).tolist()
 
-def random_phone():
-    """Generate random phone number."""
-    return f"+1-{random.randint(200,999)}-{random.randint(100,999)}-{random.randint(1000,9999)}"
 
+def loan_schedule(principals, rates, terms, paid_months):
+    """Monthly annuity payment and outstanding principal for arrays of loans (rates in annual %)."""
+    monthly_rates = np.asarray(rates, dtype=np.float64) / 1200.0
+    terms = np.asarray(terms, dtype=np.float64)
+    monthly = principals * monthly_rates / (1.0 - np.power(1.0 + monthly_rates, -terms))
+    outstanding = principals * (1.0 - paid_months / terms)
+    return np.round(monthly, 2), np.round(outstanding, 2)
 
-def random_email(first, last):
-    """Generate email from name."""
-    domains = ['gmail.com', 'yahoo.com', 'outlook.com', 'protonmail.com', 'icloud.com']
-    return f"{first.lower()}.{last.lower()}@{random.choice(domains)}"
+
+def random_phones(n):
+    """Generate n random "+1-AAA-MMM-TTTT" phone numbers from three integer arrays."""
+    areas = RNG.integers(200, 1000, n).astype(str)
+    mids = RNG.integers(100, 1000, n).astype(str)
+    tails = RNG.integers(1000, 10000, n).astype(str)
+    return np.char.add(
+        np.char.add(np.char.add("+1-", areas), np.char.add("-", mids)),
+        np.char.add("-", tails)
+    ).tolist()
+
+
+def build_emails(firsts, lasts, domains):
+    """Compose first.last@domain emails from arrays of names (domains: array or one string)."""
+    local_parts = np.char.add(np.char.add(np.char.lower(firsts), "."), np.char.lower(lasts))
+    return np.char.add(np.char.add(local_parts, "@"), domains).tolist()
 
 
 def write_csv(filename, headers, rows):
-    """Write CSV file to incoming folder."""
+    """Stream an iterable of rows to a CSV file in the incoming folder. Returns (filename, rows)."""
     filepath = os.path.join(INCOMING_FOLDER, filename)
-    with open(filepath, 'w', newline='', encoding='utf-8') as f:
+    rows = iter(rows)
+    count = 0
+    with open(filepath, 'w', newline='', encoding='utf-8', buffering=CSV_BUFFER_BYTES) as f:
         writer = csv.writer(f)
         writer.writerow(headers)
-        writer.writerows(rows)
-    print(f"  Created: {filename} ({len(rows)} rows)")
+        while chunk := list(islice(rows, CSV_CHUNK_ROWS)):
+            # Most fields are IDs, numbers and enums, so join each chunk as
+            # plain text; only a chunk with a field that needs quoting (a comma,
+            # quote or line break) or a None (an empty field for csv.writer,
+            # "None" for str) goes through csv.writer
+            text = ''.join([','.join(map(str, row)) + '\r\n' for row in chunk])
+            if (text.count(',') == (len(headers) - 1) * len(chunk)
+                    and text.count('\n') == len(chunk) and text.count('\r') == len(chunk)
+                    and '"' not in text and 'None' not in text):
+                f.write(text)
+            else:
+                writer.writerows(chunk)
+            count += len(chunk)
+    # One write per line so output from parallel workers doesn't interleave
+    print(f"  Created: {filename} ({count} rows)\n", end='', flush=True)
+    return filename, count
+
+
+def seed_rng(seed):
+    """Replace RNG with a generator built from seed (an int, a SeedSequence or None)."""
+    global RNG
+    RNG = np.random.default_rng(seed)
+
+
+def run_job(seed, generate, *args):
+    """Run one generator in a worker process on its own child seed."""
+    seed_rng(seed)
+    return generate(*args)
 
 
 def get_max_ids_from_db(db_path):
@@ -230,245 +355,206 @@ def generate_customer_profiles(start_id, n=200):
     """Generate new customer profiles with diverse names."""
     headers = ['customer_id', 'name', 'email', 'phone', 'address', 'city', 'state',
                'segment', 'risk_rating', 'created_date', 'status']
-    rows = []
-
-    for i in range(1, n + 1):
-        cid = start_id + i
-        first = random.choice(FIRST_NAMES)
-        last = random.choice(LAST_NAMES)
-        city_idx = random.randint(0, len(CITIES) - 1)
-
-        rows.append([
-            f"CUST{cid:06d}",
-            f"{first} {last}",
-            random_email(first, last),
-            random_phone(),
-            f"{random.randint(100, 9999)} {random.choice(STREET_NAMES)}",
-            CITIES[city_idx],
-            STATES[city_idx],
-            random.choice(SEGMENTS),
-            random.choice(RISK_RATINGS),
-            random_date(2024, 2026),
-            random.choices(['active', 'inactive', 'closed'], weights=[85, 10, 5])[0]
-        ])
-
-    write_csv(f"customer_profiles_{DATE_STR}.csv", headers, rows)
-    return [row[0] for row in rows]
+    customer_ids = format_ids("CUST", start_id, n, 6)
+
+    # One array/list per column, zipped into rows only when writing
+    firsts = RNG.choice(FIRST_NAMES, n)
+    lasts = RNG.choice(LAST_NAMES, n)
+    names = np.char.add(np.char.add(firsts, " "), lasts).tolist()
+    emails = build_emails(firsts, lasts, RNG.choice(EMAIL_DOMAINS, n))
+    phones = random_phones(n)
+    addresses = np.char.add(
+        np.char.add(RNG.integers(100, 10000, n).astype(str), " "), RNG.choice(STREET_NAMES, n)
+    ).tolist()
+    city_idxs = RNG.integers(0, len(CITIES), n)
+    cities = CITIES[city_idxs].tolist()
+    states = STATES[city_idxs].tolist()
+    segments = RNG.choice(SEGMENTS, n).tolist()
+    risks = RNG.choice(RISK_RATINGS, n).tolist()
+    created = random_dates(n, 2024, 2026)
+    statuses = weighted_pick(CUSTOMER_STATUS, n)
+
+    written = write_csv(f"customer_profiles_{DATE_STR}.csv", headers, zip(
+        customer_ids, names, emails, phones, addresses, cities, states,
+        segments, risks, created, statuses
+    ))
+    return customer_ids, written
 
 
 def generate_account_products(customer_ids, existing_branches, start_id, n=350):
     """Generate new accounts for the new customers."""
     headers = ['account_id', 'customer_id', 'branch_id', 'account_type', 'account_number',
                'balance', 'currency', 'opened_date', 'status']
-    rows = []
-
-    for i in range(1, n + 1):
-        aid = start_id + i
-        acc_type = random.choice(ACCOUNT_TYPES)
-
-        if acc_type == 'checking':
-            balance = round(random.uniform(100, 50000), 2)
-        elif acc_type == 'savings':
-            balance = round(random.uniform(1000, 200000), 2)
-        elif acc_type == 'credit':
-            balance = round(random.uniform(-10000, 0), 2)
-        else:
-            balance = round(random.uniform(-500000, -10000), 2)
-
-        branch = random.choice(existing_branches) if existing_branches else f"BR{random.randint(1,50):03d}"
-
-        rows.append([
-            f"ACC{aid:08d}",
-            random.choice(customer_ids),
-            branch,
-            acc_type,
-            f"****{random.randint(1000, 9999)}",
-            balance,
-            random.choices(['USD', 'EUR'], weights=[85, 15])[0],
-            random_date(2023, 2026),
-            random.choices(['active', 'dormant', 'closed'], weights=[90, 7, 3])[0]
-        ])
-
-    write_csv(f"account_products_{DATE_STR}.csv", headers, rows)
-    return [row[0] for row in rows]
+    account_ids = format_ids("ACC", start_id, n, 8)
+
+    customers = pick_ids(customer_ids, n)
+    if existing_branches:
+        branches = pick_ids(existing_branches, n)
+    else:
+        branches = np.char.add("BR", np.char.zfill(RNG.integers(1, 51, n).astype(str), 3)).tolist()
+    type_idxs = RNG.integers(0, len(ACCOUNT_TYPES), n)
+    acc_types = ACCOUNT_TYPES[type_idxs].tolist()
+    numbers = np.char.add("****", RNG.integers(1000, 10000, n).astype(str)).tolist()
+    balances = np.round(RNG.uniform(BALANCE_LOW[type_idxs], BALANCE_HIGH[type_idxs]), 2).tolist()
+    currencies = weighted_pick(CURRENCY, n)
+    opened = random_dates(n, 2023, 2026)
+    statuses = weighted_pick(ACCOUNT_STATUS, n)
+
+    written = write_csv(f"account_products_{DATE_STR}.csv", headers, zip(
+        account_ids, customers, branches, acc_types, numbers,
+        balances, currencies, opened, statuses
+    ))
+    return account_ids, written
 
 
 def generate_loans(account_ids, start_id, n=80):
     """Generate new loans."""
     headers = ['loan_id', 'account_id', 'loan_type', 'principal', 'interest_rate',
                'term_months', 'monthly_payment', 'outstanding', 'start_date', 'end_date', 'status']
-    rows = []
-
-    for i in range(1, n + 1):
-        lid = start_id + i
-        loan_type = random.choice(LOAN_TYPES)
-
-        if loan_type == 'mortgage':
-            principal = round(random.uniform(100000, 1000000), 2)
-            term = random.choice([180, 240, 360])
-        elif loan_type == 'auto':
-            principal = round(random.uniform(10000, 80000), 2)
-            term = random.choice([36, 48, 60, 72])
-        elif loan_type == 'business':
-            principal = round(random.uniform(50000, 500000), 2)
-            term = random.choice([12, 24, 36, 60])
-        else:
-            principal = round(random.uniform(5000, 50000), 2)
-            term = random.choice([12, 24, 36, 48, 60])
-
-        rate = round(random.uniform(3.5, 15.0), 2)
-        monthly = round(principal * (rate / 100 / 12) / (1 - (1 + rate / 100 / 12) ** (-term)), 2)
-        paid_months = random.randint(0, term)
-        outstanding = round(principal * (1 - paid_months / term), 2)
-
-        start = random_date(2023, 2026)
-        start_dt = datetime.strptime(start, "%Y-%m-%d")
-        end_dt = start_dt + timedelta(days=term * 30)
-
-        rows.append([
-            f"LOAN{lid:06d}",
-            random.choice(account_ids),
-            loan_type,
-            principal,
-            rate,
-            term,
-            monthly,
-            outstanding,
-            start,
-            end_dt.strftime("%Y-%m-%d"),
-            random.choices(['active', 'paid_off', 'defaulted'], weights=[70, 25, 5])[0]
-        ])
-
-    write_csv(f"loans_{DATE_STR}.csv", headers, rows)
+
+    # Draw and compute every column for the batch as whole arrays
+    loan_types = RNG.choice(LOAN_TYPES, n)
+    principals = np.empty(n)
+    terms = np.empty(n, dtype=np.int32)
+    for loan_type, (low, high, term_options) in LOAN_TERMS.items():
+        mask = loan_types == loan_type
+        count = int(mask.sum())
+        principals[mask] = RNG.uniform(low, high, count)
+        terms[mask] = RNG.choice(term_options, count)
+    principals = np.round(principals, 2)
+    rates = np.round(RNG.uniform(3.5, 15.0, n), 2)
+    paid_months = RNG.integers(0, terms + 1, dtype=np.int32)
+    monthly, outstanding = loan_schedule(principals, rates, terms, paid_months)
+
+    start_days = random_days(n, 2023, 2026)
+    starts = start_days.astype(str).tolist()
+    ends = (start_days + terms * 30).astype(str).tolist()
+    accounts = pick_ids(account_ids, n)
+    statuses = weighted_pick(LOAN_STATUS, n)
+
+    rows = zip(
+        format_ids("LOAN", start_id, n, 6),
+        accounts, loan_types.tolist(), principals.tolist(), rates.tolist(), terms.tolist(),
+        monthly.tolist(), outstanding.tolist(), starts, ends, statuses
+    )
+
+    return write_csv(f"loans_{DATE_STR}.csv", headers, rows)
 
 
 def generate_credit_cards(account_ids, start_id, n=120):
     """Generate new credit cards."""
     headers = ['card_id', 'account_id', 'card_number', 'card_type', 'credit_limit',
                'available_credit', 'apr', 'expiry_date', 'status']
-    rows = []
-
-    for i in range(1, n + 1):
-        cid = start_id + i
-        limit = random.choice([1000, 2500, 5000, 10000, 15000, 25000, 50000])
-        used = round(random.uniform(0, limit * 0.8), 2)
-
-        rows.append([
-            f"CARD{cid:06d}",
-            random.choice(account_ids),
-            f"****-****-****-{random.randint(1000, 9999)}",
-            random.choice(CARD_TYPES),
-            limit,
-            round(limit - used, 2),
-            round(random.uniform(12.99, 24.99), 2),
-            f"20{random.randint(27, 31)}-{random.randint(1, 12):02d}",
-            random.choices(['active', 'blocked', 'expired'], weights=[90, 5, 5])[0]
-        ])
-
-    write_csv(f"credit_cards_{DATE_STR}.csv", headers, rows)
+    card_ids = format_ids("CARD", start_id, n, 6)
+
+    accounts = pick_ids(account_ids, n)
+    card_numbers = np.char.add("****-****-****-", RNG.integers(1000, 10000, n).astype(str)).tolist()
+    card_types = RNG.choice(CARD_TYPES, n).tolist()
+    limits = RNG.choice(CREDIT_LIMITS, n)
+    used = np.round(RNG.uniform(0, limits * 0.8), 2)
+    available = np.round(limits - used, 2).tolist()
+    aprs = np.round(RNG.uniform(12.99, 24.99, n), 2).tolist()
+    expiries = np.char.add(
+        np.char.add(RNG.integers(2027, 2032, n).astype(str), "-"),
+        np.char.zfill(RNG.integers(1, 13, n).astype(str), 2)
+    ).tolist()
+    statuses = weighted_pick(CARD_STATUS, n)
+
+    return write_csv(f"credit_cards_{DATE_STR}.csv", headers, zip(
+        card_ids, accounts, card_numbers, card_types, limits.tolist(),
+        available, aprs, expiries, statuses
+    ))
 
 
 def generate_branches(start_id, n=10):
     """Generate a few new branches."""
     headers = ['branch_id', 'branch_name', 'address', 'city', 'state', 'postal_code',
                'phone', 'hours', 'services']
-    rows = []
-
-    for i in range(1, n + 1):
-        bid = start_id + i
-        city_idx = random.randint(0, len(CITIES) - 1)
-        rows.append([
-            f"BR{bid:03d}",
-            f"{CITIES[city_idx]} Branch {bid}",
-            f"{random.randint(100, 9999)} {random.choice(STREET_NAMES)}",
-            CITIES[city_idx],
-            STATES[city_idx],
-            f"{random.randint(10000, 99999)}",
-            random_phone(),
-            "Mon-Fri 9AM-5PM, Sat 9AM-1PM",
-            "deposits,withdrawals,loans,investments"
-        ])
-
-    write_csv(f"branches_{DATE_STR}.csv", headers, rows)
-    return [row[0] for row in rows]
+    branch_ids = format_ids("BR", start_id, n, 3)
+
+    city_idxs = RNG.integers(0, len(CITIES), n)
+    cities = CITIES[city_idxs]
+    states = STATES[city_idxs].tolist()
+    names = np.char.add(
+        np.char.add(cities, " Branch "), np.arange(start_id + 1, start_id + n + 1).astype(str)
+    ).tolist()
+    addresses = np.char.add(
+        np.char.add(RNG.integers(100, 10000, n).astype(str), " "), RNG.choice(STREET_NAMES, n)
+    ).tolist()
+    postal_codes = RNG.integers(10000, 100000, n).astype(str).tolist()
+    phones = random_phones(n)
+
+    written = write_csv(f"branches_{DATE_STR}.csv", headers, zip(
+        branch_ids, names, addresses, cities.tolist(), states, postal_codes, phones,
+        repeat("Mon-Fri 9AM-5PM, Sat 9AM-1PM"),
+        repeat("deposits,withdrawals,loans,investments")
+    ))
+    return branch_ids, written
 
 
 def generate_employees(branch_ids, start_id, n=40):
     """Generate new employees for new branches."""
     headers = ['employee_id', 'branch_id', 'name', 'role', 'email', 'phone', 'hire_date', 'status']
-    rows = []
+    employee_ids = format_ids("EMP", start_id, n, 5)
 
-    for i in range(1, n + 1):
-        eid = start_id + i
-        first = random.choice(FIRST_NAMES)
-        last = random.choice(LAST_NAMES)
+    branches = pick_ids(branch_ids, n)
+    firsts = RNG.choice(FIRST_NAMES, n)
+    lasts = RNG.choice(LAST_NAMES, n)
+    names = np.char.add(np.char.add(firsts, " "), lasts).tolist()
+    roles = RNG.choice(ROLES, n).tolist()
+    emails = build_emails(firsts, lasts, "bank.com")
+    phones = random_phones(n)
+    hired = random_dates(n, 2020, 2026)
+    statuses = weighted_pick(EMPLOYEE_STATUS, n)
 
-        rows.append([
-            f"EMP{eid:05d}",
-            random.choice(branch_ids),
-            f"{first} {last}",
-            random.choice(ROLES),
-            f"{first.lower()}.{last.lower()}@bank.com",
-            random_phone(),
-            random_date(2020, 2026),
-            random.choices(['active', 'on_leave', 'terminated'], weights=[90, 7, 3])[0]
-        ])
-
-    write_csv(f"employees_{DATE_STR}.csv", headers, rows)
+    return write_csv(f"employees_{DATE_STR}.csv", headers, zip(
+        employee_ids, branches, names, roles, emails, phones, hired, statuses
+    ))
 
 
 def generate_atm_locations(branch_ids, start_id, n=20):
     """Generate new ATM locations."""
     headers = ['atm_id', 'branch_id', 'address', 'city', 'latitude', 'longitude',
                'available_24h', 'withdrawal_fee', 'deposit_enabled', 'status']
-    rows = []
-
-    for i in range(1, n + 1):
-        aid = start_id + i
-        city_idx = random.randint(0, len(CITIES) - 1)
-        rows.append([
-            f"ATM{aid:04d}",
-            random.choice(branch_ids),
-            f"{random.randint(100, 9999)} {random.choice(STREET_NAMES)}",
-            CITIES[city_idx],
-            round(random.uniform(25.0, 48.0), 6),
-            round(random.uniform(-122.0, -71.0), 6),
-            random.choice([0, 1]),
-            round(random.choice([0, 2.5, 3.0, 3.5]), 2),
-            random.choice([0, 1]),
-            random.choices(['operational', 'maintenance', 'offline'], weights=[90, 7, 3])[0]
-        ])
-
-    write_csv(f"atm_locations_{DATE_STR}.csv", headers, rows)
+    atm_ids = format_ids("ATM", start_id, n, 4)
+
+    branches = pick_ids(branch_ids, n)
+    addresses = np.char.add(
+        np.char.add(RNG.integers(100, 10000, n).astype(str), " "), RNG.choice(STREET_NAMES, n)
+    ).tolist()
+    cities = RNG.choice(CITIES, n).tolist()
+    latitudes = np.round(RNG.uniform(25.0, 48.0, n), 6).tolist()
+    longitudes = np.round(RNG.uniform(-122.0, -71.0, n), 6).tolist()
+    open_24h = RNG.integers(0, 2, n).tolist()
+    fees = RNG.choice(WITHDRAWAL_FEES, n).tolist()
+    deposits = RNG.integers(0, 2, n).tolist()
+    statuses = weighted_pick(ATM_STATUS, n)
+
+    return write_csv(f"atm_locations_{DATE_STR}.csv", headers, zip(
+        atm_ids, branches, addresses, cities, latitudes, longitudes,
+        open_24h, fees, deposits, statuses
+    ))
 
 
 def generate_investments(account_ids, start_id, n=50):
     """Generate new investments."""
     headers = ['investment_id', 'account_id', 'asset_type', 'symbol', 'quantity',
                'purchase_price', 'current_price', 'current_value', 'purchase_date']
-    rows = []
-
-    for i in range(1, n + 1):
-        iid = start_id + i
-        asset = random.choice(ASSET_TYPES)
-        symbol = random.choice(SYMBOLS)
-        qty = round(random.uniform(1, 500), 2)
-        purchase = round(random.uniform(50, 500), 2)
-        current = round(purchase * random.uniform(0.7, 1.5), 2)
-
-        rows.append([
-            f"INV{iid:06d}",
-            random.choice(account_ids),
-            asset,
-            symbol,
-            qty,
-            purchase,
-            current,
-            round(qty * current, 2),
-            random_date(2024, 2026)
-        ])
-
-    write_csv(f"investments_{DATE_STR}.csv", headers, rows)
+    investment_ids = format_ids("INV", start_id, n, 6)
+
+    accounts = pick_ids(account_ids, n)
+    assets = RNG.choice(ASSET_TYPES, n).tolist()
+    symbols = RNG.choice(SYMBOLS, n).tolist()
+    quantities = np.round(RNG.uniform(1, 500, n), 2)
+    purchases = np.round(RNG.uniform(50, 500, n), 2)
+    currents = np.round(purchases * RNG.uniform(0.7, 1.5, n), 2)
+    values = np.round(quantities * currents, 2)
+    purchased = random_dates(n, 2024, 2026)
+
+    return write_csv(f"investments_{DATE_STR}.csv", headers, zip(
+        investment_ids, accounts, assets, symbols, quantities.tolist(),
+        purchases.tolist(), currents.tolist(), values.tolist(), purchased
+    ))
 
 
 def generate_pending_transactions(all_account_ids, start_id, n=200):
@@ -478,44 +564,34 @@ def generate_pending_transactions(all_account_ids, start_id, n=200):
     """
     headers = ['transaction_id', 'account_id', 'amount', 'currency', 'transaction_type',
                'description', 'status', 'created_date', 'expected_clear']
-    rows = []
+    transaction_ids = format_ids("TXN", start_id, n, 8)
+
+    accounts = pick_ids(all_account_ids, n)
+    is_credit = RNG.random(n) < 0.5
+    txn_types = np.where(is_credit, 'credit', 'debit').tolist()
+    amounts = np.round(RNG.uniform(10, 8000, n), 2)
+    amounts = np.where(is_credit, amounts, -amounts).tolist()
+    statuses = weighted_pick(TXN_STATUS, n)
+
+    # Pick a credit or debit description for every row, then append the
+    # reference numbers only where the description ends in "Ref#"
+    descs = np.where(
+        is_credit,
+        RNG.choice(DESCRIPTIONS_CREDIT, n),
+        RNG.choice(DESCRIPTIONS_DEBIT, n)
+    )
+    refs = RNG.integers(10000, 100000, n).astype(str)
+    descs = np.where(np.char.endswith(descs, 'Ref#'), np.char.add(descs, refs), descs).tolist()
 
-    descriptions_credit = [
-        'Direct Deposit - Payroll', 'Wire Transfer In', 'Deposit - Ref#{}',
-        'ACH Credit - Refund', 'Mobile Deposit', 'Transfer In - Savings',
-        'Interest Payment', 'Cashback Reward'
-    ]
-    descriptions_debit = [
-        'Payment - Ref#{}', 'Bill Pay - Utilities', 'ACH Debit - Insurance',
-        'Wire Transfer Out', 'Online Purchase', 'Transfer Out - Checking',
-        'Subscription Payment', 'Mortgage Payment', 'Rent Payment'
-    ]
+    # Created 0-5 days before now, expected to clear 1-3 days later
+    created = np.datetime64(datetime.now(), 's') - RNG.integers(0, 6, n).astype('timedelta64[D]')
+    expected = (created.astype('datetime64[D]') + RNG.integers(1, 4, n)).astype(str).tolist()
+    created = np.char.replace(np.datetime_as_string(created, unit='s'), 'T', ' ').tolist()
 
-    for i in range(1, n + 1):
-        tid = start_id + i
-        txn_type = random.choice(['credit', 'debit'])
-        amount = round(random.uniform(10, 8000), 2)
-        created = datetime.now() - timedelta(days=random.randint(0, 5))
-        expected = created + timedelta(days=random.randint(1, 3))
-
-        if txn_type == 'credit':
-            desc = random.choice(descriptions_credit).format(random.randint(10000, 99999))
-        else:
-            desc = random.choice(descriptions_debit).format(random.randint(10000, 99999))
-
-        rows.append([
-            f"TXN{tid:08d}",
-            random.choice(all_account_ids),
-            amount if txn_type == 'credit' else -amount,
-            'USD',
-            txn_type,
-            desc,
-            random.choice(['pending', 'processing']),
-            created.strftime("%Y-%m-%d %H:%M:%S"),
-            expected.strftime("%Y-%m-%d")
-        ])
-
-    write_csv(f"pending_transactions_{DATE_STR}.csv", headers, rows)
+    return write_csv(f"pending_transactions_{DATE_STR}.csv", headers, zip(
+        transaction_ids, accounts, amounts, repeat('USD'), txn_types,
+        descs, statuses, created, expected
+    ))
 
 
 def generate_failed_transactions(all_account_ids, start_id, n=60):
@@ -524,25 +600,19 @@ def generate_failed_transactions(all_account_ids, start_id, n=60):
     """
     headers = ['transaction_id', 'account_id', 'amount', 'currency', 'transaction_type',
                'error_code', 'error_message', 'attempted_date', 'merchant']
-    rows = []
-
-    for i in range(1, n + 1):
-        fid = start_id + i
-        err_code = random.choice(list(ERROR_CODES.keys()))
+    transaction_ids = format_ids("FTXN", start_id, n, 7)
 
-        rows.append([
-            f"FTXN{fid:07d}",
-            random.choice(all_account_ids),
-            round(random.uniform(10, 3000), 2),
-            'USD',
-            'debit',
-            err_code,
-            ERROR_CODES[err_code],
-            random_date(2025, 2026),
-            random.choice(MERCHANTS)
-        ])
+    accounts = pick_ids(all_account_ids, n)
+    amounts = np.round(RNG.uniform(10, 3000, n), 2).tolist()
+    err_codes = RNG.choice(list(ERROR_CODES), n).tolist()
+    err_messages = [ERROR_CODES[code] for code in err_codes]
+    attempted = random_dates(n, 2025, 2026)
+    merchants = RNG.choice(MERCHANTS, n).tolist()
 
-    write_csv(f"failed_transactions_{DATE_STR}.csv", headers, rows)
+    return write_csv(f"failed_transactions_{DATE_STR}.csv", headers, zip(
+        transaction_ids, accounts, amounts, repeat('USD'), repeat('debit'),
+        err_codes, err_messages, attempted, merchants
+    ))
 
 
 # ============================================================================
@@ -578,85 +648,77 @@ def main():
     if max_ids:
         print(f"  Starting IDs after: {max_ids}")
 
+    # One root seed per run (set SEED to repeat a run); the serial steps and
+    # each parallel job draw from their own child streams of it
+    seeds = np.random.SeedSequence(int(os.environ.get('SEED', '0')) or None)
+    print(f"  Random seed: {seeds.entropy}")
+    seed_rng(seeds.spawn(1)[0])
+
     # Generate new data
     print("\nGenerating CSV files...")
 
+    # CSV file -> rows written, for the summary
+    row_counts = {}
+
     # 1. New customers (200 new customers with diverse names)
-    new_customer_ids = generate_customer_profiles(
+    new_customer_ids, (filename, count) = generate_customer_profiles(
         max_ids.get('customer', 500), n=200
     )
+    row_counts[filename] = count
 
     # 2. New accounts for new customers
-    new_account_ids = generate_account_products(
+    new_account_ids, (filename, count) = generate_account_products(
         new_customer_ids, existing_branches,
         max_ids.get('account', 800), n=350
     )
+    row_counts[filename] = count
 
     # 3. New branches
-    new_branch_ids = generate_branches(
+    new_branch_ids, (filename, count) = generate_branches(
         max_ids.get('branch', 50), n=10
     )
+    row_counts[filename] = count
     all_branches = existing_branches + new_branch_ids
-
-    # 4. New employees for both existing and new branches
-    generate_employees(
-        all_branches,
-        max_ids.get('employee', 250), n=40
-    )
-
-    # 5. New ATM locations
-    generate_atm_locations(
-        all_branches,
-        max_ids.get('atm', 100), n=20
-    )
-
-    # 6. New loans for new accounts
-    generate_loans(
-        new_account_ids,
-        max_ids.get('loan', 200), n=80
-    )
-
-    # 7. New credit cards for new accounts
-    generate_credit_cards(
-        new_account_ids,
-        max_ids.get('card', 300), n=120
-    )
-
-    # 8. New investments for new accounts
-    generate_investments(
-        new_account_ids,
-        max_ids.get('investment', 100), n=50
-    )
-
-    # 9. Transactions for BOTH existing AND new accounts
     all_accounts = existing_accounts + new_account_ids
     print(f"\n  Generating transactions for {len(all_accounts)} accounts "
           f"({len(existing_accounts)} existing + {len(new_account_ids)} new)")
 
-    generate_pending_transactions(
-        all_accounts,
-        max_ids.get('transaction', 150), n=200
-    )
-
-    generate_failed_transactions(
-        all_accounts,
-        max_ids.get('failed_txn', 50), n=60
-    )
+    # The remaining files only depend on the IDs above, so they are
+    # generated in parallel worker processes: (generator, IDs, start ID, rows)
+    jobs = [
+        # 4. New employees for both existing and new branches
+        (generate_employees, all_branches, max_ids.get('employee', 250), 40),
+        # 5. New ATM locations
+        (generate_atm_locations, all_branches, max_ids.get('atm', 100), 20),
+        # 6. New loans for new accounts
+        (generate_loans, new_account_ids, max_ids.get('loan', 200), 80),
+        # 7. New credit cards for new accounts
+        (generate_credit_cards, new_account_ids, max_ids.get('card', 300), 120),
+        # 8. New investments for new accounts
+        (generate_investments, new_account_ids, max_ids.get('investment', 100), 50),
+        # 9. Transactions for BOTH existing AND new accounts
+        (generate_pending_transactions, all_accounts, max_ids.get('transaction', 150), 200),
+        (generate_failed_transactions, all_accounts, max_ids.get('failed_txn', 50), 60),
+    ]
+    job_seeds = seeds.spawn(len(jobs))
+    with ProcessPoolExecutor(max_workers=min(GENERATOR_WORKERS, len(jobs))) as pool:
+        futures = [
+            pool.submit(run_job, seed, generate, ids, start_id, n)
+            for seed, (generate, ids, start_id, n) in zip(job_seeds, jobs)
+        ]
+        for future in as_completed(futures):
+            filename, count = future.result()
+            row_counts[filename] = count
 
     # Summary
     print("\n" + "=" * 70)
     print("DATA GENERATION COMPLETE")
     print("=" * 70)
 
-    files = sorted([f for f in os.listdir(INCOMING_FOLDER) if f.endswith('.csv')])
-    total_rows = 0
-    print(f"\nGenerated {len(files)} CSV files in data/incoming/:")
-    for f in files:
-        filepath = os.path.join(INCOMING_FOLDER, f)
-        with open(filepath, 'r') as fh:
-            count = sum(1 for _ in fh) - 1
-        total_rows += count
-        print(f"  - {f} ({count:,} rows)")
+    total_rows = sum(row_counts.values())
+    print(f"\nGenerated {len(row_counts)} CSV files in data/incoming/:")
+    for filename, count in sorted(row_counts.items()):
+        print(f"  - {filename} ({count:,} rows)")
 
     print(f"\nTotal new rows: {total_rows:,}")
     print(f"\n{'=' * 70}")
@@ -2,17 +2,26 @@
 Sample Data Generator
 =====================
 Generates realistic sample CSV data for testing and demo purposes.
+Files are written gzip-compressed (.csv.gz); csv_importer.py reads them as is.
 
 Usage:
     python scripts/generate_sample_data.py
+    SEED=42 python scripts/generate_sample_data.py    (reproducible random data)
 
 Author: Nevra Donat
 """
 
 import csv
 import os
-import random
-from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import numpy as np
+
+try:
+    from isal import igzip as gzip  # same API as gzip, several times faster
+except ImportError:
+    import gzip
 
 
 # Configuration
@@ -22,351 +31,414 @@ def get_project_root():
 
 SAMPLE_FOLDER = os.path.normpath(os.path.join(get_project_root(), 'data', 'sample'))
 DATE_STR = datetime.now().strftime("%Y%m%d")
-
-# Random data pools
-FIRST_NAMES = ['James', 'Mary', 'John', 'Patricia', 'Robert', 'Jennifer', 'Michael', 'Linda',
+RNG = np.random.default_rng()
+CSV_CHUNK_ROWS = 1000  # rows handed to csv.writer per writerows() call
+CSV_BUFFER_BYTES = 1 << 20  # write buffer per plain CSV file
+CSV_GZIP_LEVEL = 1  # fastest level; the repetitive columns still compress well
+GENERATOR_WORKERS = os.cpu_count() or 1
+
+# Random data pools, as NumPy arrays so whole columns can be drawn at once
+FIRST_NAMES = np.array(['James', 'Mary', 'John', 'Patricia', 'Robert', 'Jennifer', 'Michael', 'Linda',
                'William', 'Elizabeth', 'David', 'Barbara', 'Richard', 'Susan', 'Joseph', 'Jessica',
-               'Thomas', 'Sarah', 'Charles', 'Karen', 'Emma', 'Oliver', 'Ava', 'Noah', 'Sophia','Nevra','Kevin','Arel']
+               'Thomas', 'Sarah', 'Charles', 'Karen', 'Emma', 'Oliver', 'Ava', 'Noah', 'Sophia','Nevra','Kevin','Arel'])
 
-LAST_NAMES = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis',
+LAST_NAMES = np.array(['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis',
               'Rodriguez', 'Martinez', 'Hernandez', 'Lopez', 'Gonzalez', 'Wilson', 'Anderson',
-              'Thomas', 'Taylor', 'Moore', 'Jackson', 'Martin', 'Lee', 'Thompson', 'White','Donat','Daw','Karem']
+              'Thomas', 'Taylor', 'Moore', 'Jackson', 'Martin', 'Lee', 'Thompson', 'White','Donat','Daw','Karem'])
 
-CITIES = ['New York', 'Los Angeles', 'Chicago', 'Houston', 'Phoenix', 'Philadelphia',
+CITIES = np.array(['New York', 'Los Angeles', 'Chicago', 'Houston', 'Phoenix', 'Philadelphia',
           'San Antonio', 'San Diego', 'Dallas', 'San Jose', 'Austin', 'Jacksonville',
-          'Fort Worth', 'Columbus', 'Charlotte', 'Seattle', 'Denver', 'Boston', 'Detroit', 'Portland','Istanbul','Los Angelas', 'London']
-
-STATES = ['NY', 'CA', 'IL', 'TX', 'AZ', 'PA', 'TX', 'CA', 'TX', 'CA',
-          'TX', 'FL', 'TX', 'OH', 'NC', 'WA', 'CO', 'MA', 'MI', 'OR','LA','IST','LDN']
-
-SEGMENTS = ['retail', 'premium', 'private', 'business']
-RISK_RATINGS = ['low', 'medium', 'high']
-ACCOUNT_TYPES = ['checking', 'savings', 'credit', 'loan']
-CURRENCIES = ['USD', 'EUR', 'GBP']
-LOAN_TYPES = ['personal', 'mortgage', 'auto', 'business']
-CARD_TYPES = ['visa', 'mastercard', 'amex']
-ASSET_TYPES = ['stock', 'bond', 'mutual_fund', 'etf']
-TRANSACTION_TYPES = ['debit', 'credit']
-ERROR_CODES = ['E001', 'E002', 'E003', 'E004', 'E005']
+          'Fort Worth', 'Columbus', 'Charlotte', 'Seattle', 'Denver', 'Boston', 'Detroit', 'Portland','Istanbul','Los Angelas', 'London'])
+
+STATES = np.array(['NY', 'CA', 'IL', 'TX', 'AZ', 'PA', 'TX', 'CA', 'TX', 'CA',
+          'TX', 'FL', 'TX', 'OH', 'NC', 'WA', 'CO', 'MA', 'MI', 'OR','LA','IST','LDN'])
+
+SEGMENTS = np.array(['retail', 'premium', 'private', 'business'])
+RISK_RATINGS = np.array(['low', 'medium', 'high'])
+ACCOUNT_TYPES = np.array(['checking', 'savings', 'credit', 'loan'])
+# Balance range per account type, in ACCOUNT_TYPES order
+BALANCE_LOW = np.array([100, 1000, -10000, -500000])
+BALANCE_HIGH = np.array([50000, 200000, 0, -10000])
+LOAN_TYPES = np.array(['personal', 'mortgage', 'auto', 'business'])
+# Principal range and term options (months) per loan type
+LOAN_TERMS = {
+    'personal': (5000, 50000, [12, 24, 36, 48, 60]),
+    'mortgage': (100000, 1000000, [180, 240, 360]),
+    'auto': (10000, 80000, [36, 48, 60, 72]),
+    'business': (50000, 500000, [12, 24, 36, 60]),
+}
+CARD_TYPES = np.array(['visa', 'mastercard', 'amex'])
+CREDIT_LIMITS = np.array([1000, 2500, 5000, 10000, 15000, 25000, 50000])
+ASSET_TYPES = np.array(['stock', 'bond', 'mutual_fund', 'etf'])
+TRANSACTION_TYPES = np.array(['debit', 'credit'])
+ERROR_CODES = np.array(['E001', 'E002', 'E003', 'E004', 'E005'])
+# Message per error code, in ERROR_CODES order
+ERROR_MESSAGES = np.array(['Insufficient funds', 'Card declined', 'Invalid PIN', 'Expired card', 'Fraud suspected'])
+MERCHANTS = np.array(['Amazon', 'Walmart', 'Target', 'Best Buy', 'Costco', 'Gas Station', 'Restaurant'])
+SYMBOLS = np.array(['AAPL', 'GOOGL', 'MSFT', 'AMZN', 'TSLA', 'META', 'NVDA', 'JPM', 'V', 'JNJ',
+                    'BND', 'AGG', 'TLT', 'VFIAX', 'FXAIX', 'SPY', 'QQQ', 'VTI', 'IWM'])
+ROLES = np.array(['Teller', 'Manager', 'Loan Officer', 'Customer Service', 'Financial Advisor'])
+EMAIL_DOMAINS = np.array(['gmail.com', 'yahoo.com', 'outlook.com', 'email.com'])
+WITHDRAWAL_FEES = np.array([0, 2.5, 3.0, 3.5])
 FREQUENCIES = ['daily', 'weekly', 'monthly', 'yearly']
+TXN_STATUSES = np.array(['pending', 'processing'])
+
+# Weighted enum columns as (values, probabilities), drawn with weighted_choice()
+CUSTOMER_STATUS = (np.array(['active', 'inactive', 'closed']), np.array([0.85, 0.10, 0.05]))
+ACCOUNT_STATUS = (np.array(['active', 'dormant', 'closed']), np.array([0.90, 0.07, 0.03]))
+CURRENCY = (np.array(['USD', 'EUR', 'GBP']), np.array([0.80, 0.15, 0.05]))
+LOAN_STATUS = (np.array(['active', 'paid_off', 'defaulted']), np.array([0.70, 0.25, 0.05]))
+CARD_STATUS = (np.array(['active', 'blocked', 'expired']), np.array([0.90, 0.05, 0.05]))
+EMPLOYEE_STATUS = (np.array(['active', 'on_leave', 'terminated']), np.array([0.90, 0.07, 0.03]))
+ATM_STATUS = (np.array(['operational', 'maintenance', 'offline']), np.array([0.90, 0.07, 0.03]))
+
+
+def random_days(n, start_year=2024, end_year=2026):
+    """Draw n random days (datetime64[D]) between Jan 1 of start_year and Dec 31 of end_year."""
+    start = np.datetime64(f"{start_year}-01-01")
+    days = int((np.datetime64(f"{end_year}-12-31") - start).astype(int))
+    return start + RNG.integers(0, days + 1, n)
+
+
+def random_dates(n, start_year=2024, end_year=2026):
+    """Draw n random date strings at once."""
+    return random_days(n, start_year, end_year).astype(str).tolist()
+
 
+def format_ids(prefix, n, width):
+    """Build IDs 1..n (prefix + zero-padded number) with NumPy string ops."""
+    numbers = np.arange(1, n + 1).astype(str)
+    return np.char.add(prefix, np.char.zfill(numbers, width)).tolist()
 
-def random_date(start_year=2024, end_year=2026):
-    """Generate random date string."""
-    start = datetime(start_year, 1, 1)
-    end = datetime(end_year, 12, 31)
-    delta = end - start
-    random_days = random.randint(0, delta.days)
-    return (start + timedelta(days=random_days)).strftime("%Y-%m-%d")
 
+def weighted_choice(column, n):
+    """Draw n values of a (values, probabilities) column."""
+    values, probabilities = column
+    return RNG.choice(values, n, p=probabilities).tolist()
 
-def random_phone():
-    """Generate random phone number."""
-    return f"+1-{random.randint(200,999)}-{random.randint(100,999)}-{random.randint(1000,9999)}"
 
+def random_phones(n):
+    """Generate n random phone numbers."""
+    areas = RNG.integers(200, 1000, n).tolist()
+    mids = RNG.integers(100, 1000, n).tolist()
+    tails = RNG.integers(1000, 10000, n).tolist()
+    return [f"+1-{area}-{mid}-{tail}" for area, mid, tail in zip(areas, mids, tails)]
 
-def random_email(first, last):
-    """Generate email from name."""
-    domains = ['gmail.com', 'yahoo.com', 'outlook.com', 'email.com']
-    return f"{first.lower()}.{last.lower()}@{random.choice(domains)}"
 
+def random_emails(firsts, lasts):
+    """Generate an email for every first/last name pair."""
+    domains = RNG.choice(EMAIL_DOMAINS, len(firsts)).tolist()
+    return [f"{first.lower()}.{last.lower()}@{domain}" for first, last, domain in zip(firsts, lasts, domains)]
 
-def write_csv(filename, headers, rows):
-    """Write CSV file."""
+
+def loan_schedule(principals, rates, terms, paid_months):
+    """Monthly annuity payment and outstanding principal for arrays of loans (rates in annual %)."""
+    monthly_rates = np.asarray(rates) / 1200.0
+    terms = np.asarray(terms, dtype=np.float64)
+    monthly = principals * monthly_rates / (1.0 - np.power(1.0 + monthly_rates, -terms))
+    outstanding = principals * (1.0 - paid_months / terms)
+    return np.round(monthly, 2), np.round(outstanding, 2)
+
+
+def write_csv(filename, cols):
+    """Stream a dict of header -> column (list or array) to a CSV file (gzip-compressed if the name ends in .gz)."""
     filepath = os.path.join(SAMPLE_FOLDER, filename)
-    with open(filepath, 'w', newline='', encoding='utf-8') as f:
+    columns = list(cols.values())
+    count = len(columns[0])
+    if filename.endswith('.gz'):
+        f = gzip.open(filepath, 'wt', newline='', encoding='utf-8', compresslevel=CSV_GZIP_LEVEL)
+    else:
+        f = open(filepath, 'w', newline='', encoding='utf-8', buffering=CSV_BUFFER_BYTES)
+    with f:
         writer = csv.writer(f)
-        writer.writerow(headers)
-        writer.writerows(rows)
-    print(f"  Created: {filename} ({len(rows)} rows)")
+        writer.writerow(cols)
+        # Columns are only zipped into row tuples here, one chunk at a time
+        for start in range(0, count, CSV_CHUNK_ROWS):
+            writer.writerows(zip(*(column[start:start + CSV_CHUNK_ROWS] for column in columns)))
+    # One write per line so output from parallel workers doesn't interleave
+    print(f"  Created: {filename} ({count} rows)\n", end='', flush=True)
+
+
+def seed_rng(seed):
+    """Replace RNG with a generator built from seed (an int, a SeedSequence or None)."""
+    global RNG
+    RNG = np.random.default_rng(seed)
+
+
+def run_job(seed, generate, *args):
+    """Run one generator in a worker process on its own child seed."""
+    seed_rng(seed)
+    return generate(*args)
 
 
 def generate_customer_profiles(n=500):
     """Generate customer_profiles CSV."""
-    headers = ['customer_id', 'name', 'email', 'phone', 'address', 'city', 'state',
-               'segment', 'risk_rating', 'created_date', 'status']
-    rows = []
-
-    for i in range(1, n + 1):
-        first = random.choice(FIRST_NAMES)
-        last = random.choice(LAST_NAMES)
-        city_idx = random.randint(0, len(CITIES) - 1)
-
-        rows.append([
-            f"CUST{i:06d}",
-            f"{first} {last}",
-            random_email(first, last),
-            random_phone(),
-            f"{random.randint(100, 9999)} {last} Street",
-            CITIES[city_idx],
-            STATES[city_idx],
-            random.choice(SEGMENTS),
-            random.choice(RISK_RATINGS),
-            random_date(2020, 2025),
-            random.choices(['active', 'inactive', 'closed'], weights=[85, 10, 5])[0]
-        ])
-
-    write_csv(f"customer_profiles_{DATE_STR}.csv", headers, rows)
-    return [row[0] for row in rows]  # Return customer IDs
+    customer_ids = format_ids("CUST", n, 6)
+
+    # Draw every column in one call, then lay them out as named columns
+    firsts = RNG.choice(FIRST_NAMES, n).tolist()
+    lasts = RNG.choice(LAST_NAMES, n).tolist()
+    city_idxs = RNG.integers(0, len(CITIES), n)
+    names = [f"{first} {last}" for first, last in zip(firsts, lasts)]
+    addresses = [f"{number} {last} Street"
+                 for number, last in zip(RNG.integers(100, 10000, n).tolist(), lasts)]
+    statuses = weighted_choice(CUSTOMER_STATUS, n)
+
+    cols = {
+        'customer_id': customer_ids,
+        'name': names,
+        'email': random_emails(firsts, lasts),
+        'phone': random_phones(n),
+        'address': addresses,
+        'city': CITIES[city_idxs].tolist(),
+        'state': STATES[city_idxs].tolist(),
+        'segment': RNG.choice(SEGMENTS, n).tolist(),
+        'risk_rating': RNG.choice(RISK_RATINGS, n).tolist(),
+        'created_date': random_dates(n, 2020, 2025),
+        'status': statuses,
+    }
+
+    write_csv(f"customer_profiles_{DATE_STR}.csv.gz", cols)
+    return customer_ids
 
 
 def generate_account_products(customer_ids, n=800):
     """Generate account_products CSV."""
-    headers = ['account_id', 'customer_id', 'branch_id', 'account_type', 'account_number',
-               'balance', 'currency', 'opened_date', 'status']
-    rows = []
-
-    for i in range(1, n + 1):
-        acc_type = random.choice(ACCOUNT_TYPES)
-        if acc_type == 'checking':
-            balance = round(random.uniform(100, 50000), 2)
-        elif acc_type == 'savings':
-            balance = round(random.uniform(1000, 200000), 2)
-        elif acc_type == 'credit':
-            balance = round(random.uniform(-10000, 0), 2)
-        else:
-            balance = round(random.uniform(-500000, -10000), 2)
-
-        rows.append([
-            f"ACC{i:08d}",
-            random.choice(customer_ids),
-            f"BR{random.randint(1, 50):03d}",
-            acc_type,
-            f"****{random.randint(1000, 9999)}",
-            balance,
-            random.choices(CURRENCIES, weights=[80, 15, 5])[0],
-            random_date(2018, 2025),
-            random.choices(['active', 'dormant', 'closed'], weights=[90, 7, 3])[0]
-        ])
-
-    write_csv(f"account_products_{DATE_STR}.csv", headers, rows)
-    return [row[0] for row in rows]  # Return account IDs
+    account_ids = format_ids("ACC", n, 8)
+
+    # One uniform draw for every balance, each within its account type's range
+    type_idxs = RNG.integers(0, len(ACCOUNT_TYPES), n)
+    acc_types = ACCOUNT_TYPES[type_idxs].tolist()
+    balances = np.round(RNG.uniform(BALANCE_LOW[type_idxs], BALANCE_HIGH[type_idxs]), 2).tolist()
+    branches = [f"BR{branch:03d}" for branch in RNG.integers(1, 51, n).tolist()]
+    numbers = [f"****{number}" for number in RNG.integers(1000, 10000, n).tolist()]
+    currencies = weighted_choice(CURRENCY, n)
+    statuses = weighted_choice(ACCOUNT_STATUS, n)
+
+    cols = {
+        'account_id': account_ids,
+        'customer_id': RNG.choice(customer_ids, n).tolist(),
+        'branch_id': branches,
+        'account_type': acc_types,
+        'account_number': numbers,
+        'balance': balances,
+        'currency': currencies,
+        'opened_date': random_dates(n, 2018, 2025),
+        'status': statuses,
+    }
+
+    write_csv(f"account_products_{DATE_STR}.csv.gz", cols)
+    return account_ids
 
 
 def generate_loans(account_ids, n=200):
     """Generate loans CSV."""
-    headers = ['loan_id', 'account_id', 'loan_type', 'principal', 'interest_rate',
-               'term_months', 'monthly_payment', 'outstanding', 'start_date', 'end_date', 'status']
-    rows = []
-
-    for i in range(1, n + 1):
-        loan_type = random.choice(LOAN_TYPES)
-        if loan_type == 'mortgage':
-            principal = round(random.uniform(100000, 1000000), 2)
-            term = random.choice([180, 240, 360])
-        elif loan_type == 'auto':
-            principal = round(random.uniform(10000, 80000), 2)
-            term = random.choice([36, 48, 60, 72])
-        elif loan_type == 'business':
-            principal = round(random.uniform(50000, 500000), 2)
-            term = random.choice([12, 24, 36, 60])
-        else:
-            principal = round(random.uniform(5000, 50000), 2)
-            term = random.choice([12, 24, 36, 48, 60])
-
-        rate = round(random.uniform(3.5, 15.0), 2)
-        monthly = round(principal * (rate / 100 / 12) / (1 - (1 + rate / 100 / 12) ** (-term)), 2)
-        paid_months = random.randint(0, term)
-        outstanding = round(principal * (1 - paid_months / term), 2)
-
-        start = random_date(2020, 2025)
-        start_dt = datetime.strptime(start, "%Y-%m-%d")
-        end_dt = start_dt + timedelta(days=term * 30)
-
-        rows.append([
-            f"LOAN{i:06d}",
-            random.choice(account_ids),
-            loan_type,
-            principal,
-            rate,
-            term,
-            monthly,
-            outstanding,
-            start,
-            end_dt.strftime("%Y-%m-%d"),
-            random.choices(['active', 'paid_off', 'defaulted'], weights=[70, 25, 5])[0]
-        ])
-
-    write_csv(f"loans_{DATE_STR}.csv", headers, rows)
+    loan_ids = format_ids("LOAN", n, 6)
+    accounts = RNG.choice(account_ids, n).tolist()
+    loan_types = RNG.choice(LOAN_TYPES, n)
+    statuses = weighted_choice(LOAN_STATUS, n)
+
+    # Principals and terms are drawn per loan type with a mask, everything
+    # else for the whole batch at once
+    principals = np.empty(n)
+    terms = np.empty(n, dtype=np.int64)
+    for loan_type, (low, high, term_options) in LOAN_TERMS.items():
+        mask = loan_types == loan_type
+        count = int(mask.sum())
+        principals[mask] = RNG.uniform(low, high, count)
+        terms[mask] = RNG.choice(term_options, count)
+    principals = np.round(principals, 2)
+    rates = np.round(RNG.uniform(3.5, 15.0, n), 2)
+    paid_months = RNG.integers(0, terms + 1)
+
+    # Dates stay datetime64 until they are formatted for the CSV
+    monthly, outstanding = loan_schedule(principals, rates, terms, paid_months)
+    start_days = random_days(n, 2020, 2025)
+    end_days = start_days + terms * 30
+
+    cols = {
+        'loan_id': loan_ids,
+        'account_id': accounts,
+        'loan_type': loan_types.tolist(),
+        'principal': principals.tolist(),
+        'interest_rate': rates.tolist(),
+        'term_months': terms.tolist(),
+        'monthly_payment': monthly.tolist(),
+        'outstanding': outstanding.tolist(),
+        'start_date': start_days.astype(str).tolist(),
+        'end_date': end_days.astype(str).tolist(),
+        'status': statuses,
+    }
+
+    write_csv(f"loans_{DATE_STR}.csv.gz", cols)
 
 
 def generate_credit_cards(account_ids, n=300):
     """Generate credit_cards CSV."""
-    headers = ['card_id', 'account_id', 'card_number', 'card_type', 'credit_limit',
-               'available_credit', 'apr', 'expiry_date', 'status']
-    rows = []
 
-    for i in range(1, n + 1):
-        limit = random.choice([1000, 2500, 5000, 10000, 15000, 25000, 50000])
-        used = round(random.uniform(0, limit * 0.8), 2)
+    limits = RNG.choice(CREDIT_LIMITS, n)
+    used = np.round(RNG.uniform(0, limits * 0.8), 2)
+    card_numbers = [f"****-****-****-{number}" for number in RNG.integers(1000, 10000, n).tolist()]
+    expiries = [f"20{year}-{month:02d}"
+                for year, month in zip(RNG.integers(26, 31, n).tolist(), RNG.integers(1, 13, n).tolist())]
+    statuses = weighted_choice(CARD_STATUS, n)
 
-        rows.append([
-            f"CARD{i:06d}",
-            random.choice(account_ids),
-            f"****-****-****-{random.randint(1000, 9999)}",
-            random.choice(CARD_TYPES),
-            limit,
-            round(limit - used, 2),
-            round(random.uniform(12.99, 24.99), 2),
-            f"20{random.randint(26, 30)}-{random.randint(1, 12):02d}",
-            random.choices(['active', 'blocked', 'expired'], weights=[90, 5, 5])[0]
-        ])
+    cols = {
+        'card_id': format_ids("CARD", n, 6),
+        'account_id': RNG.choice(account_ids, n).tolist(),
+        'card_number': card_numbers,
+        'card_type': RNG.choice(CARD_TYPES, n).tolist(),
+        'credit_limit': limits.tolist(),
+        'available_credit': np.round(limits - used, 2).tolist(),
+        'apr': np.round(RNG.uniform(12.99, 24.99, n), 2).tolist(),
+        'expiry_date': expiries,
+        'status': statuses,
+    }
 
-    write_csv(f"credit_cards_{DATE_STR}.csv", headers, rows)
+    write_csv(f"credit_cards_{DATE_STR}.csv.gz", cols)
 
 
 def generate_branches(n=50):
     """Generate branches CSV."""
-    headers = ['branch_id', 'branch_name', 'address', 'city', 'state', 'postal_code',
-               'phone', 'hours', 'services']
-    rows = []
-
-    for i in range(1, n + 1):
-        city_idx = random.randint(0, len(CITIES) - 1)
-        rows.append([
-            f"BR{i:03d}",
-            f"{CITIES[city_idx]} Branch {i}",
-            f"{random.randint(100, 9999)} Main Street",
-            CITIES[city_idx],
-            STATES[city_idx],
-            f"{random.randint(10000, 99999)}",
-            random_phone(),
-            "Mon-Fri 9AM-5PM, Sat 9AM-1PM",
-            "deposits,withdrawals,loans,investments"
-        ])
-
-    write_csv(f"branches_{DATE_STR}.csv", headers, rows)
-    return [row[0] for row in rows]
+    branch_ids = format_ids("BR", n, 3)
+
+    city_idxs = RNG.integers(0, len(CITIES), n)
+    cities = CITIES[city_idxs].tolist()
+    names = [f"{city} Branch {i}" for i, city in enumerate(cities, 1)]
+    addresses = [f"{number} Main Street" for number in RNG.integers(100, 10000, n).tolist()]
+
+    cols = {
+        'branch_id': branch_ids,
+        'branch_name': names,
+        'address': addresses,
+        'city': cities,
+        'state': STATES[city_idxs].tolist(),
+        'postal_code': RNG.integers(10000, 100000, n).astype(str).tolist(),
+        'phone': random_phones(n),
+        'hours': ["Mon-Fri 9AM-5PM, Sat 9AM-1PM"] * n,
+        'services': ["deposits,withdrawals,loans,investments"] * n,
+    }
+
+    write_csv(f"branches_{DATE_STR}.csv.gz", cols)
+    return branch_ids
 
 
 def generate_employees(branch_ids, n=250):
     """Generate employees CSV."""
-    headers = ['employee_id', 'branch_id', 'name', 'role', 'email', 'phone', 'hire_date', 'status']
-    roles = ['Teller', 'Manager', 'Loan Officer', 'Customer Service', 'Financial Advisor']
-    rows = []
 
-    for i in range(1, n + 1):
-        first = random.choice(FIRST_NAMES)
-        last = random.choice(LAST_NAMES)
+    firsts = RNG.choice(FIRST_NAMES, n).tolist()
+    lasts = RNG.choice(LAST_NAMES, n).tolist()
+    names = [f"{first} {last}" for first, last in zip(firsts, lasts)]
+    emails = [f"{first.lower()}.{last.lower()}@bank.com" for first, last in zip(firsts, lasts)]
+    statuses = weighted_choice(EMPLOYEE_STATUS, n)
 
-        rows.append([
-            f"EMP{i:05d}",
-            random.choice(branch_ids),
-            f"{first} {last}",
-            random.choice(roles),
-            f"{first.lower()}.{last.lower()}@bank.com",
-            random_phone(),
-            random_date(2015, 2025),
-            random.choices(['active', 'on_leave', 'terminated'], weights=[90, 7, 3])[0]
-        ])
+    cols = {
+        'employee_id': format_ids("EMP", n, 5),
+        'branch_id': RNG.choice(branch_ids, n).tolist(),
+        'name': names,
+        'role': RNG.choice(ROLES, n).tolist(),
+        'email': emails,
+        'phone': random_phones(n),
+        'hire_date': random_dates(n, 2015, 2025),
+        'status': statuses,
+    }
 
-    write_csv(f"employees_{DATE_STR}.csv", headers, rows)
+    write_csv(f"employees_{DATE_STR}.csv.gz", cols)
 
 
 def generate_pending_transactions(account_ids, n=150):
     """Generate pending_transactions CSV."""
-    headers = ['transaction_id', 'account_id', 'amount', 'currency', 'transaction_type',
-               'description', 'status', 'created_date', 'expected_clear']
-    rows = []
-
-    for i in range(1, n + 1):
-        txn_type = random.choice(TRANSACTION_TYPES)
-        amount = round(random.uniform(10, 5000), 2)
-        created = datetime.now() - timedelta(days=random.randint(0, 5))
-        expected = created + timedelta(days=random.randint(1, 3))
-
-        rows.append([
-            f"TXN{i:08d}",
-            random.choice(account_ids),
-            amount if txn_type == 'credit' else -amount,
-            'USD',
-            txn_type,
-            f"{'Deposit' if txn_type == 'credit' else 'Payment'} - Ref#{random.randint(10000, 99999)}",
-            random.choice(['pending', 'processing']),
-            created.strftime("%Y-%m-%d %H:%M:%S"),
-            expected.strftime("%Y-%m-%d")
-        ])
-
-    write_csv(f"pending_transactions_{DATE_STR}.csv", headers, rows)
+
+    txn_types = RNG.choice(TRANSACTION_TYPES, n)
+    is_credit = txn_types == 'credit'
+    amounts = np.round(RNG.uniform(10, 5000, n), 2)
+    descriptions = [f"{'Deposit' if credit else 'Payment'} - Ref#{ref}"
+                    for credit, ref in zip(is_credit.tolist(), RNG.integers(10000, 100000, n).tolist())]
+
+    # Created 0-5 days before now, expected to clear 1-3 days later
+    created = np.datetime64(datetime.now(), 's') - RNG.integers(0, 6, n).astype('timedelta64[D]')
+    expected = (created.astype('datetime64[D]') + RNG.integers(1, 4, n)).astype(str).tolist()
+    created = np.char.replace(np.datetime_as_string(created, unit='s'), 'T', ' ').tolist()
+
+    cols = {
+        'transaction_id': format_ids("TXN", n, 8),
+        'account_id': RNG.choice(account_ids, n).tolist(),
+        'amount': np.where(is_credit, amounts, -amounts).tolist(),
+        'currency': ['USD'] * n,
+        'transaction_type': txn_types.tolist(),
+        'description': descriptions,
+        'status': RNG.choice(TXN_STATUSES, n).tolist(),
+        'created_date': created,
+        'expected_clear': expected,
+    }
+
+    write_csv(f"pending_transactions_{DATE_STR}.csv.gz", cols)
 
 
 def generate_failed_transactions(account_ids, n=50):
     """Generate failed_transactions CSV."""
-    headers = ['transaction_id', 'account_id', 'amount', 'currency', 'transaction_type',
-               'error_code', 'error_message', 'attempted_date', 'merchant']
-    merchants = ['Amazon', 'Walmart', 'Target', 'Best Buy', 'Costco', 'Gas Station', 'Restaurant']
-    error_messages = ['Insufficient funds', 'Card declined', 'Invalid PIN', 'Expired card', 'Fraud suspected']
-    rows = []
-
-    for i in range(1, n + 1):
-        err_idx = random.randint(0, len(ERROR_CODES) - 1)
-        rows.append([
-            f"FTXN{i:07d}",
-            random.choice(account_ids),
-            round(random.uniform(10, 2000), 2),
-            'USD',
-            'debit',
-            ERROR_CODES[err_idx],
-            error_messages[err_idx],
-            random_date(2025, 2026),
-            random.choice(merchants)
-        ])
-
-    write_csv(f"failed_transactions_{DATE_STR}.csv", headers, rows)
+
+    err_idxs = RNG.integers(0, len(ERROR_CODES), n)
+    cols = {
+        'transaction_id': format_ids("FTXN", n, 7),
+        'account_id': RNG.choice(account_ids, n).tolist(),
+        'amount': np.round(RNG.uniform(10, 2000, n), 2).tolist(),
+        'currency': ['USD'] * n,
+        'transaction_type': ['debit'] * n,
+        'error_code': ERROR_CODES[err_idxs].tolist(),
+        'error_message': ERROR_MESSAGES[err_idxs].tolist(),
+        'attempted_date': random_dates(n, 2025, 2026),
+        'merchant': RNG.choice(MERCHANTS, n).tolist(),
+    }
+
+    write_csv(f"failed_transactions_{DATE_STR}.csv.gz", cols)
 
 
 def generate_investments(account_ids, n=100):
     """Generate investments CSV."""
-    headers = ['investment_id', 'account_id', 'asset_type', 'symbol', 'quantity',
-               'purchase_price', 'current_price', 'current_value', 'purchase_date']
-    symbols = ['AAPL', 'GOOGL', 'MSFT', 'AMZN', 'TSLA', 'META', 'NVDA', 'JPM', 'V', 'JNJ',
-               'BND', 'AGG', 'TLT', 'VFIAX', 'FXAIX', 'SPY', 'QQQ', 'VTI', 'IWM']
-    rows = []
-
-    for i in range(1, n + 1):
-        asset = random.choice(ASSET_TYPES)
-        symbol = random.choice(symbols)
-        qty = round(random.uniform(1, 500), 2)
-        purchase = round(random.uniform(50, 500), 2)
-        current = round(purchase * random.uniform(0.7, 1.5), 2)
-
-        rows.append([
-            f"INV{i:06d}",
-            random.choice(account_ids),
-            asset,
-            symbol,
-            qty,
-            purchase,
-            current,
-            round(qty * current, 2),
-            random_date(2020, 2025)
-        ])
-
-    write_csv(f"investments_{DATE_STR}.csv", headers, rows)
+
+    quantities = np.round(RNG.uniform(1, 500, n), 2)
+    purchases = np.round(RNG.uniform(50, 500, n), 2)
+    currents = np.round(purchases * RNG.uniform(0.7, 1.5, n), 2)
+
+    cols = {
+        'investment_id': format_ids("INV", n, 6),
+        'account_id': RNG.choice(account_ids, n).tolist(),
+        'asset_type': RNG.choice(ASSET_TYPES, n).tolist(),
+        'symbol': RNG.choice(SYMBOLS, n).tolist(),
+        'quantity': quantities.tolist(),
+        'purchase_price': purchases.tolist(),
+        'current_price': currents.tolist(),
+        'current_value': np.round(quantities * currents, 2).tolist(),
+        'purchase_date': random_dates(n, 2020, 2025),
+    }
+
+    write_csv(f"investments_{DATE_STR}.csv.gz", cols)
 
 
 def generate_atm_locations(branch_ids, n=100):
     """Generate atm_locations CSV."""
-    headers = ['atm_id', 'branch_id', 'address', 'city', 'latitude', 'longitude',
-               'available_24h', 'withdrawal_fee', 'deposit_enabled', 'status']
-    rows = []
-
-    for i in range(1, n + 1):
-        city_idx = random.randint(0, len(CITIES) - 1)
-        rows.append([
-            f"ATM{i:04d}",
-            random.choice(branch_ids) if random.random() > 0.3 else '',
-            f"{random.randint(100, 9999)} {random.choice(LAST_NAMES)} Ave",
-            CITIES[city_idx],
-            round(random.uniform(25.0, 48.0), 6),
-            round(random.uniform(-122.0, -71.0), 6),
-            random.choice([0, 1]),
-            round(random.choice([0, 2.5, 3.0, 3.5]), 2),
-            random.choice([0, 1]),
-            random.choices(['operational', 'maintenance', 'offline'], weights=[90, 7, 3])[0]
-        ])
-
-    write_csv(f"atm_locations_{DATE_STR}.csv", headers, rows)
+
+    # About 70% of ATMs belong to a branch, the rest are stand-alone
+    branches = np.where(RNG.random(n) > 0.3, RNG.choice(branch_ids, n), '').tolist()
+    addresses = [f"{number} {last} Ave"
+                 for number, last in zip(RNG.integers(100, 10000, n).tolist(), RNG.choice(LAST_NAMES, n).tolist())]
+    statuses = weighted_choice(ATM_STATUS, n)
+
+    cols = {
+        'atm_id': format_ids("ATM", n, 4),
+        'branch_id': branches,
+        'address': addresses,
+        'city': RNG.choice(CITIES, n).tolist(),
+        'latitude': np.round(RNG.uniform(25.0, 48.0, n), 6).tolist(),
+        'longitude': np.round(RNG.uniform(-122.0, -71.0, n), 6).tolist(),
+        'available_24h': RNG.integers(0, 2, n).tolist(),
+        'withdrawal_fee': RNG.choice(WITHDRAWAL_FEES, n).tolist(),
+        'deposit_enabled': RNG.integers(0, 2, n).tolist(),
+        'status': statuses,
+    }
+
+    write_csv(f"atm_locations_{DATE_STR}.csv.gz", cols)
 
 
 def main():
@@ -382,6 +454,13 @@ def main():
 
     print(f"\nOutput folder: {SAMPLE_FOLDER}")
     print(f"Date suffix: {DATE_STR}")
+
+    # One root seed per run (set SEED to repeat a run); the serial steps and
+    # each parallel job draw from their own child streams of it
+    seeds = np.random.SeedSequence(int(os.environ.get('SEED', '0')) or None)
+    print(f"Random seed: {seeds.entropy}")
+    seed_rng(seeds.spawn(1)[0])
+
     print("\nGenerating CSV files...")
 
     # Generate data with dependencies
@@ -389,14 +468,25 @@ def main():
     account_ids = generate_account_products(customer_ids, 800)
     branch_ids = generate_branches(50)
 
-    # Generate related data
-    generate_loans(account_ids, 200)
-    generate_credit_cards(account_ids, 300)
-    generate_employees(branch_ids, 250)
-    generate_pending_transactions(account_ids, 150)
-    generate_failed_transactions(account_ids, 50)
-    generate_investments(account_ids, 100)
-    generate_atm_locations(branch_ids, 100)
+    # The related files only depend on the IDs above, so they are
+    # generated in parallel worker processes: (generator, IDs, rows)
+    jobs = [
+        (generate_loans, account_ids, 200),
+        (generate_credit_cards, account_ids, 300),
+        (generate_employees, branch_ids, 250),
+        (generate_pending_transactions, account_ids, 150),
+        (generate_failed_transactions, account_ids, 50),
+        (generate_investments, account_ids, 100),
+        (generate_atm_locations, branch_ids, 100),
+    ]
+    job_seeds = seeds.spawn(len(jobs))
+    with ProcessPoolExecutor(max_workers=min(GENERATOR_WORKERS, len(jobs))) as pool:
+        futures = [
+            pool.submit(run_job, seed, generate, ids, n)
+            for seed, (generate, ids, n) in zip(job_seeds, jobs)
+        ]
+        for future in as_completed(futures):
+            future.result()
 
     print("\n" + "=" * 70)
     print("SAMPLE DATA GENERATION COMPLETE")
@@ -404,7 +494,7 @@ def main():
 
     # List files
     files = os.listdir(SAMPLE_FOLDER)
-    csv_files = [f for f in files if f.endswith('.csv')]
+    csv_files = [f for f in files if f.endswith(('.csv', '.csv.gz'))]
 
     print(f"\nGenerated {len(csv_files)} CSV files:")
     for f in sorted(csv_files):
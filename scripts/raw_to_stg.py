@@ -2,7 +2,8 @@
 Raw to Staging Processor
 ========================
 Moves data from raw tables to staging tables with key-based deduplication.
-Only inserts records that don't already exist in staging (based on primary key).
+Only inserts records that don't already exist in staging (based on primary key),
+enforced by a UNIQUE constraint on the key column(s) of each staging table.
 
 Usage:
     python scripts/raw_to_stg.py
@@ -15,6 +16,8 @@ import json
 import os
 from datetime import datetime
 
+from table_counts import update_table_counts
+
 
 # ============================================================================
 # CONFIGURATION
@@ -65,11 +68,26 @@ def get_all_raw_tables(conn):
     return [row[0] for row in cursor.fetchall()]
 
 
-def get_table_columns(conn, table_name):
-    """Get column names and types from a table."""
+def get_table_schemas(conn):
+    """
+    Get the columns of every raw and stg table in one query.
+
+    Returns dict {table_name: [(column_name, column_type), ...]}; a stg table
+    is missing from it if it doesn't exist yet.
+    """
     cursor = conn.cursor()
-    cursor.execute(f"PRAGMA table_info([{table_name}])")
-    return [(row[1], row[2]) for row in cursor.fetchall()]
+    cursor.execute("""
+        SELECT m.name, p.name, p.type
+        FROM sqlite_master m
+        JOIN pragma_table_info(m.name) p
+        WHERE m.type='table'
+        AND (m.name LIKE 'raw%' OR m.name LIKE 'stg%')
+        ORDER BY m.name, p.cid
+    """)
+    schemas = {}
+    for table_name, column_name, column_type in cursor.fetchall():
+        schemas.setdefault(table_name, []).append((column_name, column_type))
+    return schemas
 
 
 def table_exists(conn, table_name):
@@ -82,11 +100,15 @@ def table_exists(conn, table_name):
     return cursor.fetchone() is not None
 
 
-def get_row_count(conn, table_name):
-    """Get row count of a table."""
+def get_non_empty_tables(conn, table_names):
+    """Get the set of tables that have at least one row (without counting them all), in one query."""
+    if not table_names:
+        return set()
     cursor = conn.cursor()
-    cursor.execute(f"SELECT COUNT(*) FROM [{table_name}]")
-    return cursor.fetchone()[0]
+    cursor.execute(" UNION ALL ".join(
+        f"SELECT '{name}' WHERE EXISTS (SELECT 1 FROM [{name}])" for name in table_names
+    ))
+    return {row[0] for row in cursor.fetchall()}
 
 
 def raw_to_stg_name(raw_table_name):
@@ -115,20 +137,19 @@ def get_base_table_name(raw_table_name):
 # STAGING LOGIC
 # ============================================================================
 
-def create_stg_table(conn, raw_table_name, stg_table_name):
+def get_data_columns(columns):
+    """Get (name, type) of a raw table's data columns, without raw metadata columns."""
+    return [(name, dtype) for name, dtype in columns if not name.startswith('_')]
+
+
+def create_stg_table(conn, stg_table_name, columns, key_columns=None):
     """
-    Create staging table with same structure as raw table.
-    Adds staging metadata columns.
+    Create staging table with the raw table's data columns (from get_data_columns).
+    Adds staging metadata columns, and a UNIQUE constraint on key_columns
+    (move_data_to_stg skips already staged keys with INSERT OR IGNORE).
     """
     cursor = conn.cursor()
 
-    # Get columns from raw table
-    columns = get_table_columns(conn, raw_table_name)
-
-    # Filter out raw metadata columns (we'll add stg metadata)
-    columns = [(name, dtype) for name, dtype in columns
-               if not name.startswith('_')]
-
     # Build column definitions
     col_defs = [f'"{name}" {dtype}' for name, dtype in columns]
 
@@ -136,6 +157,11 @@ def create_stg_table(conn, raw_table_name, stg_table_name):
     col_defs.append('"_stg_loaded_at" TEXT')
     col_defs.append('"_stg_source_table" TEXT')
 
+    # Deduplicate on the key inside the table's own index
+    if key_columns:
+        key_list = ', '.join([f'"{key}"' for key in key_columns])
+        col_defs.append(f'UNIQUE ({key_list})')
+
     # Create table
     sql = f"""
         CREATE TABLE IF NOT EXISTS [{stg_table_name}] (
@@ -143,44 +169,112 @@ def create_stg_table(conn, raw_table_name, stg_table_name):
         )
     """
     cursor.execute(sql)
-    conn.commit()
 
-    return [name for name, _ in columns]
+
+def has_unique_key(conn, table_name, key_columns):
+    """Check if a table has a UNIQUE constraint or index on exactly the key column(s)."""
+    cursor = conn.cursor()
+    cursor.execute(f"PRAGMA index_list([{table_name}])")
+    for _, index_name, unique, _, partial in cursor.fetchall():
+        if unique and not partial:
+            cursor.execute(f"PRAGMA index_info([{index_name}])")
+            if sorted(row[2] for row in cursor.fetchall()) == sorted(key_columns):
+                return True
+    return False
+
+
+def create_key_index(conn, stg_table_name, key_columns):
+    """
+    Create a UNIQUE index on the key column(s) of a staging table created
+    without the UNIQUE constraint.
+
+    Returns False if the table already holds duplicate keys (loaded before
+    the index existed); it then gets a plain index on the keys instead.
+    Once that plain index exists the UNIQUE attempt is skipped, so later
+    runs don't rebuild an index that is bound to fail.
+    """
+    cursor = conn.cursor()
+    key_list = ', '.join([f'"{key}"' for key in key_columns])
+    index_suffix = '_'.join(key_columns)
+
+    cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='index' AND name=?",
+        (f"ix_{stg_table_name}_{index_suffix}",)
+    )
+    if cursor.fetchone():
+        return False
+
+    try:
+        cursor.execute(f"""
+            CREATE UNIQUE INDEX IF NOT EXISTS [ux_{stg_table_name}_{index_suffix}]
+            ON [{stg_table_name}] ({key_list})
+        """)
+        return True
+    except sqlite3.IntegrityError:
+        cursor.execute(f"""
+            CREATE INDEX IF NOT EXISTS [ix_{stg_table_name}_{index_suffix}]
+            ON [{stg_table_name}] ({key_list})
+        """)
+        return False
 
 
 def get_key_columns(base_name, configs):
     """
     Get primary key column(s) for a table from config.
 
+    An entry is either a list of columns or {"keys": [...], "raw_unique": true}.
+
     Returns list of column names, or None if not configured.
     """
     keys_config = configs['keys']
 
     if base_name in keys_config:
-        return keys_config[base_name]
+        entry = keys_config[base_name]
+        if isinstance(entry, dict):
+            return entry.get('keys')
+        return entry
 
     return None
 
 
-def move_data_to_stg(conn, raw_table_name, stg_table_name, key_columns, data_columns):
+def is_raw_unique(base_name, configs):
+    """
+    Check if a table's config entry sets "raw_unique": its raw table never
+    holds duplicate rows, so staging can skip the SELECT DISTINCT pass.
+    """
+    entry = configs['keys'].get(base_name)
+    return isinstance(entry, dict) and bool(entry.get('raw_unique'))
+
+
+def move_data_to_stg(conn, raw_table_name, stg_table_name, key_columns, data_columns,
+                     unique_keys=False, raw_unique=False):
     """
     Move data from raw to staging with deduplication.
 
-    If key_columns is provided, only insert rows where key doesn't exist in stg.
+    If key_columns is provided, only insert rows where key doesn't exist in stg
+    (left to the UNIQUE key index when unique_keys is True).
     If key_columns is None, use DISTINCT on all columns.
+    raw_unique=True skips DISTINCT (the raw table has no duplicate rows).
     """
     cursor = conn.cursor()
 
     now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-    # Get counts before
-    stg_count_before = get_row_count(conn, stg_table_name)
-
     # Build column list (excluding metadata columns)
     col_list = ', '.join([f'"{col}"' for col in data_columns])
+    select = 'SELECT' if raw_unique else 'SELECT DISTINCT'
 
-    if key_columns:
-        # Key-based deduplication
+    if key_columns and unique_keys:
+        # Key-based deduplication through the UNIQUE key: rows whose key is
+        # already in stg (or earlier in this batch) are skipped, so no
+        # DISTINCT pass over raw is needed
+        sql = f"""
+            INSERT OR IGNORE INTO [{stg_table_name}] ({col_list}, "_stg_loaded_at", "_stg_source_table")
+            SELECT {col_list}, ?, ?
+            FROM [{raw_table_name}]
+        """
+    elif key_columns:
+        # Key-based deduplication (stg already holds duplicate keys)
         # Build WHERE NOT EXISTS clause
         key_conditions = ' AND '.join([
             f'stg."{key}" = raw."{key}"' for key in key_columns
@@ -188,7 +282,7 @@ def move_data_to_stg(conn, raw_table_name, stg_table_name, key_columns, data_col
 
         sql = f"""
             INSERT INTO [{stg_table_name}] ({col_list}, "_stg_loaded_at", "_stg_source_table")
-            SELECT DISTINCT {col_list}, '{now}', '{raw_table_name}'
+            {select} {col_list}, ?, ?
             FROM [{raw_table_name}] raw
             WHERE NOT EXISTS (
                 SELECT 1 FROM [{stg_table_name}] stg
@@ -200,32 +294,28 @@ def move_data_to_stg(conn, raw_table_name, stg_table_name, key_columns, data_col
         # Check if row already exists (all columns match)
         sql = f"""
             INSERT INTO [{stg_table_name}] ({col_list}, "_stg_loaded_at", "_stg_source_table")
-            SELECT DISTINCT {col_list}, '{now}', '{raw_table_name}'
-            FROM [{raw_table_name}]
+            {select} {col_list}, ?, ?
+            FROM [{raw_table_name}] raw
             WHERE NOT EXISTS (
                 SELECT 1 FROM [{stg_table_name}] stg
                 WHERE {' AND '.join([f'stg."{col}" IS raw."{col}"' for col in data_columns])}
             )
         """
 
-    cursor.execute(sql)
-    conn.commit()
-
-    # Get counts after
-    stg_count_after = get_row_count(conn, stg_table_name)
-    rows_inserted = stg_count_after - stg_count_before
+    cursor.execute(sql, (now, raw_table_name))
 
     return {
-        'rows_inserted': rows_inserted,
-        'stg_before': stg_count_before,
-        'stg_after': stg_count_after
+        'rows_inserted': cursor.rowcount
     }
 
 
-def process_single_table(conn, raw_table_name, configs, log_entries):
+def process_single_table(conn, raw_table_name, configs, log_entries, schemas, non_empty):
     """
     Process a single raw table to staging.
 
+    schemas and non_empty are the table metadata read up front
+    (get_table_schemas, get_non_empty_tables).
+
     Returns dict with results.
     """
     result = {
@@ -244,28 +334,16 @@ def process_single_table(conn, raw_table_name, configs, log_entries):
     print(f"Processing: {raw_table_name} -> {stg_table_name}")
     print(f"{'─' * 70}")
 
-    # Get raw table row count
-    raw_count = get_row_count(conn, raw_table_name)
-    print(f"  Rows in raw: {raw_count:,}")
-
-    if raw_count == 0:
+    # Skip empty raw tables
+    if raw_table_name not in non_empty:
         result['message'] = "Raw table is empty"
         print(f"  SKIPPED: Raw table is empty")
         return result
 
-    # Check if stg table exists
-    stg_exists = table_exists(conn, stg_table_name)
-
-    # Get or create stg table
-    if stg_exists:
-        print(f"  Staging table exists")
-        # Get data columns (non-metadata) from raw table
-        raw_cols = get_table_columns(conn, raw_table_name)
-        data_columns = [name for name, _ in raw_cols if not name.startswith('_')]
-    else:
-        print(f"  Creating staging table...")
-        data_columns = create_stg_table(conn, raw_table_name, stg_table_name)
-        print(f"  Created: {stg_table_name}")
+    # Data columns (non-metadata) of the raw table, read once for both
+    # creating the stg table and building the INSERT
+    columns = get_data_columns(schemas[raw_table_name])
+    data_columns = [name for name, _ in columns]
 
     # Get key columns
     key_columns = get_key_columns(base_name, configs)
@@ -281,17 +359,32 @@ def process_single_table(conn, raw_table_name, configs, log_entries):
     else:
         print(f"  WARNING: No key defined, using DISTINCT on all columns")
 
+    # Get or create stg table
+    if stg_table_name in schemas:
+        print(f"  Staging table exists")
+    else:
+        print(f"  Creating staging table...")
+        create_stg_table(conn, stg_table_name, columns, key_columns)
+        print(f"  Created: {stg_table_name}")
+
+    # Staging tables created before the UNIQUE constraint get a UNIQUE index
+    unique_keys = False
+    if key_columns:
+        unique_keys = (has_unique_key(conn, stg_table_name, key_columns)
+                       or create_key_index(conn, stg_table_name, key_columns))
+        if not unique_keys:
+            print(f"  WARNING: Staging table has duplicate keys, no UNIQUE index")
+
     # Move data
     try:
-        stats = move_data_to_stg(conn, raw_table_name, stg_table_name, key_columns, data_columns)
+        stats = move_data_to_stg(conn, raw_table_name, stg_table_name, key_columns, data_columns,
+                                 unique_keys, is_raw_unique(base_name, configs))
 
         result['success'] = True
         result['rows_inserted'] = stats['rows_inserted']
         result['message'] = 'Success'
 
-        print(f"  Already in stg: {stats['stg_before']:,}")
         print(f"  New rows added: {stats['rows_inserted']:,}")
-        print(f"  Total in stg: {stats['stg_after']:,}")
 
         # Log entry
         now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -316,8 +409,13 @@ def process_single_table(conn, raw_table_name, configs, log_entries):
 # MAIN
 # ============================================================================
 
-def main():
-    """Main entry point for raw to staging processor."""
+def main(conn=None):
+    """
+    Main entry point for raw to staging processor.
+
+    conn is an open connection to reuse (run_pipeline.py passes one, opened
+    with isolation_level=None); by default the database is opened here.
+    """
 
     print("=" * 70)
     print("RAW TO STAGING PROCESSOR")
@@ -341,8 +439,13 @@ def main():
 
     print(f"\nDatabase: {db_path}")
 
-    # Connect to database
-    conn = sqlite3.connect(db_path)
+    # Connect to database. Transactions are opened explicitly: every table is
+    # staged inside one transaction, so the whole run is committed once
+    own_conn = conn is None
+    if own_conn:
+        conn = sqlite3.connect(db_path, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
 
     # Get all raw tables
     raw_tables = get_all_raw_tables(conn)
@@ -350,35 +453,49 @@ def main():
     if not raw_tables:
         print("\nNo raw tables found in database.")
         print("Please run: python scripts/csv_importer.py")
-        conn.close()
+        if own_conn:
+            conn.close()
         return False
 
     print(f"\nFound {len(raw_tables)} raw table(s)")
 
+    # Columns of every raw/stg table and which raw tables have rows, read
+    # once instead of with a few queries per table
+    schemas = get_table_schemas(conn)
+    non_empty = get_non_empty_tables(conn, raw_tables)
+
     # Process each table
     results = []
     log_entries = []
 
+    conn.execute("BEGIN")
     for i, raw_table in enumerate(raw_tables, 1):
         print(f"\n[{i}/{len(raw_tables)}]")
-        result = process_single_table(conn, raw_table, configs, log_entries)
+        result = process_single_table(conn, raw_table, configs, log_entries, schemas, non_empty)
         results.append(result)
 
-    # Write log entries
+    # Write log entries in one batch (the log table might not exist)
+    if log_entries and table_exists(conn, '_etl_log'):
+        params = [
+            (e['operation'], e['table_name'], e['rows_affected'], e['status'],
+             e['message'], e['started_at'], e['completed_at'])
+            for e in log_entries
+        ]
+        conn.executemany('''
+            INSERT INTO _etl_log (operation, table_name, rows_affected, status, message, started_at, completed_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', params)
+
+    # Refresh cached row counts of the staging tables that changed (and the
+    # log) for the dashboard; commits the whole run
+    written = [r['stg_table'] for r in results
+               if r['success'] and (r['rows_inserted'] or r['stg_table'] not in schemas)]
     if log_entries:
-        cursor = conn.cursor()
-        for entry in log_entries:
-            try:
-                cursor.execute('''
-                    INSERT INTO _etl_log (operation, table_name, rows_affected, status, message, started_at, completed_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (entry['operation'], entry['table_name'], entry['rows_affected'],
-                      entry['status'], entry['message'], entry['started_at'], entry['completed_at']))
-            except:
-                pass
-        conn.commit()
-
-    conn.close()
+        written.append('_etl_log')
+    update_table_counts(conn, written)
+
+    if own_conn:
+        conn.close()
 
     # Summary
     print("\n" + "=" * 70)
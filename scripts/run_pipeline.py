@@ -13,31 +13,51 @@ Usage:
 Author: Nevra Donat
 """
 
-import subprocess
+import sqlite3
 import sys
 import os
 
-
-def get_project_root():
-    """Get the project root directory."""
-    return os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
-
-
-def run_step(step_number, description, script, args=None, stdin_input=None):
-    """Run a single pipeline step and return True if successful."""
+import csv_importer
+import raw_to_stg
+import stg_to_rpt
+
+
+def open_shared_conn():
+    """
+    Open the database connection shared by the staging and report steps.
+
+    Returns None if the database can't be opened yet; each step then opens
+    (and reports on) the database itself.
+    """
+    try:
+        db_path = raw_to_stg.get_db_path(raw_to_stg.load_configs())
+    except Exception:
+        return None
+    if not os.path.exists(db_path):
+        return None
+
+    # Transactions are opened explicitly by the steps. Same settings as
+    # stg_to_rpt.py: WAL without per-commit fsync, a 256 MB page cache,
+    # memory-mapped reads and in-memory temp B-trees
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-262144")
+    conn.execute("PRAGMA mmap_size=268435456")
+    return conn
+
+
+def run_step(step_number, description, step):
+    """Run a single pipeline step (a function) and return True if successful."""
     print(f"\n{'=' * 70}")
     print(f"STEP {step_number}: {description}")
     print(f"{'=' * 70}\n")
 
-    cmd = [sys.executable, script]
-    if args:
-        cmd.extend(args)
-
-    result = subprocess.run(cmd, cwd=get_project_root(),
-                            input=stdin_input, text=True if stdin_input else None)
-
-    if result.returncode != 0:
-        print(f"\n>>> STEP {step_number} FAILED (exit code {result.returncode})")
+    try:
+        step()
+    except Exception as e:
+        print(f"\n>>> STEP {step_number} FAILED ({type(e).__name__}: {e})")
         return False
 
     print(f"\n>>> STEP {step_number} COMPLETED")
@@ -45,29 +65,48 @@ def run_step(step_number, description, script, args=None, stdin_input=None):
 
 
 def main():
-    root = get_project_root()
-
-    # Pass --sample flag if provided
-    importer_args = ['--sample'] if '--sample' in sys.argv else []
-
-    # stdin_input="yes\n" auto-answers the "Move processed files?" prompt
-    steps = [
-        (1, "Import CSV Data", os.path.join(root, 'scripts', 'csv_importer.py'), importer_args, "yes\n"),
-        (2, "Raw to Staging",  os.path.join(root, 'scripts', 'raw_to_stg.py'),   None, None),
-        (3, "Staging to Report", os.path.join(root, 'scripts', 'stg_to_rpt.py'), None, None),
-    ]
+    use_sample = '--sample' in sys.argv
 
     print("=" * 70)
     print("ETL PIPELINE")
     print("Banking ETL System")
     print("=" * 70)
 
-    for step_number, description, script, args, stdin_input in steps:
-        if not run_step(step_number, description, script, args, stdin_input):
-            print(f"\n{'=' * 70}")
-            print(f"PIPELINE STOPPED at Step {step_number}")
-            print(f"{'=' * 70}")
-            sys.exit(1)
+    if use_sample:
+        print("\n*** SAMPLE MODE - Using data/sample/ folder ***")
+
+    # The steps run in this process; staging and reporting share one
+    # database connection (the importer opens its own bulk-load connection)
+    conn = None
+
+    def import_csv():
+        # Processed files are always moved to the archive
+        csv_importer.main(use_sample=use_sample, move_files=True)
+
+    def stage():
+        nonlocal conn
+        conn = open_shared_conn()
+        raw_to_stg.main(conn=conn)
+
+    def report():
+        stg_to_rpt.main(conn=conn)
+
+    steps = [
+        (1, "Import CSV Data", import_csv),
+        (2, "Raw to Staging", stage),
+        (3, "Staging to Report", report),
+    ]
+
+    try:
+        for step_number, description, step in steps:
+            if not run_step(step_number, description, step):
+                print(f"\n{'=' * 70}")
+                print(f"PIPELINE STOPPED at Step {step_number}")
+                print(f"{'=' * 70}")
+                sys.exit(1)
+    finally:
+        if conn is not None:
+            conn.close()
 
     print(f"\n{'=' * 70}")
     print("PIPELINE COMPLETE - All 3 steps finished successfully")
@@ -13,7 +13,12 @@ Author: Nevra Donat
 import sqlite3
 import json
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from urllib.request import pathname2url
+
+from table_counts import update_table_counts
 
 
 # ============================================================================
@@ -39,6 +44,94 @@ def get_db_path(config):
     return os.path.normpath(os.path.join(get_project_root(), db_name))
 
 
+# Indexes on staging columns the dashboard filters and sorts by
+# (index name, table, indexed columns)
+DASHBOARD_INDEXES = [
+    ('idx_pend_created', 'stgPendingTransactions', 'created_date DESC'),
+    ('idx_fail_attempted', 'stgFailedTransactions', 'attempted_date DESC'),
+    ('idx_acct_balance', 'stgAccountProducts', 'status, balance DESC'),
+    ('idx_loans_principal', 'stgLoans', 'principal DESC'),
+]
+
+# Indexes made redundant by a REPORT_INDEXES entry that starts with the same
+# columns (idx_cust_rpt covers segment, risk_rating); dropped where they exist
+SUPERSEDED_INDEXES = ['idx_cust_seg_risk']
+
+
+# Covering indexes for the report GROUP BYs: the grouped columns first, then
+# the aggregated ones, so a summary reads its index instead of the table
+# (index name, table, indexed columns)
+REPORT_INDEXES = [
+    ('idx_cust_rpt', 'stgCustomerProfiles', ['segment', 'risk_rating', 'status']),
+    ('idx_acct_rpt', 'stgAccountProducts', ['account_type', 'currency', 'status', 'balance']),
+    ('idx_loans_rpt', 'stgLoans', ['loan_type', 'status', 'principal', 'interest_rate', 'outstanding']),
+    ('idx_pend_rpt', 'stgPendingTransactions', ['transaction_type', 'status', 'amount']),
+    ('idx_fail_rpt', 'stgFailedTransactions', ['transaction_type', 'amount']),
+    ('idx_emp_branch', 'stgEmployees', ['branch_id']),
+    ('idx_acct_branch', 'stgAccountProducts', ['branch_id']),
+]
+
+
+# Threads running the KPI queries, each on its own read-only connection
+# (1 = run them on the main connection)
+KPI_WORKERS = min(4, os.cpu_count() or 1)
+
+
+# Dashboard KPIs computed from each staging table, all in a single query per table
+# (table, [(kpi name, SQL aggregate, format, category), ...])
+KPI_QUERIES = [
+    ('stgCustomerProfiles', [
+        ('total_customers', "COUNT(*)", 'number', 'customer'),
+        ('active_customers', "COUNT(CASE WHEN status = 'active' OR status IS NULL THEN 1 END)", 'number', 'customer'),
+        ('distinct_customer_segments', "COUNT(DISTINCT segment)", 'number', 'customer'),
+        ('high_risk_customers', "COUNT(CASE WHEN risk_rating = 'high' THEN 1 END)", 'number', 'customer'),
+    ]),
+    ('stgAccountProducts', [
+        ('total_accounts', "COUNT(*)", 'number', 'account'),
+        ('total_balance', "COALESCE(SUM(balance), 0)", 'currency', 'account'),
+        ('avg_account_balance', "COALESCE(AVG(balance), 0)", 'currency', 'account'),
+    ]),
+    ('stgLoans', [
+        ('total_loans', "COUNT(*)", 'number', 'loan'),
+        ('total_loan_amount', "COALESCE(SUM(principal), 0)", 'currency', 'loan'),
+        ('active_loans', "COUNT(CASE WHEN status = 'active' OR status IS NULL THEN 1 END)", 'number', 'loan'),
+        ('avg_interest_rate', "COALESCE(AVG(interest_rate), 0)", 'percent', 'loan'),
+    ]),
+    ('stgPendingTransactions', [
+        ('pending_transactions', "COUNT(*)", 'number', 'transaction'),
+        ('pending_amount', "COALESCE(SUM(amount), 0)", 'currency', 'transaction'),
+    ]),
+    ('stgFailedTransactions', [
+        ('failed_transactions', "COUNT(*)", 'number', 'transaction'),
+    ]),
+    ('stgBranches', [
+        ('total_branches', "COUNT(*)", 'number', 'operations'),
+    ]),
+    ('stgEmployees', [
+        ('total_employees', "COUNT(*)", 'number', 'operations'),
+    ]),
+    ('stgAtmLocations', [
+        ('total_atms', "COUNT(*)", 'number', 'operations'),
+        ('atms_operational', "COUNT(CASE WHEN status = 'operational' THEN 1 END)", 'number', 'operations'),
+    ]),
+    ('stgCreditCards', [
+        ('total_credit_cards', "COUNT(*)", 'number', 'products'),
+        ('total_credit_limit', "COALESCE(SUM(credit_limit), 0)", 'currency', 'products'),
+    ]),
+    ('stgInvestments', [
+        ('total_investments', "COUNT(*)", 'number', 'products'),
+        ('total_investment_value', "COALESCE(SUM(current_value), 0)", 'currency', 'products'),
+    ]),
+]
+
+
+# Every KPI (name, SQL aggregate, format, category), in column order of rptDashboardKPIs
+KPI_COLUMNS = [kpi_def for _, kpi_defs in KPI_QUERIES for kpi_def in kpi_defs]
+
+# rptDashboardKPIs row insert, kept as one constant so the prepared statement is reused
+INSERT_KPI_SQL = f"INSERT INTO rptDashboardKPIs VALUES ({', '.join('?' * (len(KPI_COLUMNS) + 1))})"
+
+
 def table_exists(conn, table_name):
     """Check if a table exists."""
     cursor = conn.cursor()
@@ -49,138 +142,116 @@ def table_exists(conn, table_name):
     return cursor.fetchone() is not None
 
 
+def get_table_names(conn):
+    """Get the names of all tables in one query, for functions that check several."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+    return {row[0] for row in cursor.fetchall()}
+
+
+# Column names per (connection, table), filled by has_column(). Keyed on the
+# connection object (an id() can be reused by a later connection) and
+# cleared by main() at the start and end of every run, as the schema may
+# change in between.
+TABLE_COLUMNS = {}
+
+
+def has_column(conn, table_name, column_name):
+    """Check if a table has a column (PRAGMA table_info is read once per table and connection)."""
+    key = (conn, table_name)
+    columns = TABLE_COLUMNS.get(key)
+    if columns is None:
+        cursor = conn.cursor()
+        cursor.execute(f"PRAGMA table_info([{table_name}])")
+        columns = {row[1] for row in cursor.fetchall()}
+        TABLE_COLUMNS[key] = columns
+    return column_name in columns
+
+
 # ============================================================================
 # REPORT GENERATORS
 # ============================================================================
 
-def create_kpi_summary(conn):
+def get_kpi_sql(table_name, kpi_defs):
+    """Build the query computing all KPIs of one staging table."""
+    return f"SELECT {', '.join(expr for _, expr, _, _ in kpi_defs)} FROM [{table_name}]"
+
+
+def open_kpi_reader(db_path, readers, opened):
+    """
+    ThreadPoolExecutor initializer: open one read-only connection for the
+    worker thread, reused by every KPI query it runs. Connections are also
+    collected in `opened`, so the caller can close them afterwards.
     """
-    Create rptDashboardKPIs - Main KPIs for dashboard header.
+    readers.conn = sqlite3.connect(f"file:{pathname2url(db_path)}?mode=ro", uri=True,
+                                   check_same_thread=False)
+    opened.append(readers.conn)
+
+
+def query_kpis(readers, table_name, kpi_defs):
+    """Run one staging table's KPI query on the worker thread's connection (from open_kpi_reader)."""
+    return readers.conn.execute(get_kpi_sql(table_name, kpi_defs)).fetchone()
+
+
+def create_kpi_summary(conn, now):
+    """
+    Create rptDashboardKPIs - Main KPIs for dashboard header, as a single row
+    with one column per KPI (NULL if its staging table doesn't exist).
+
+    The view rptDashboardKPIs_kv lists them as (kpi_name, kpi_value,
+    kpi_format, kpi_category, updated_at) rows, the layout before.
     """
     print("\n  Creating rptDashboardKPIs...")
 
     cursor = conn.cursor()
-    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
     # Drop and recreate
+    cursor.execute("DROP VIEW IF EXISTS rptDashboardKPIs_kv")
     cursor.execute("DROP TABLE IF EXISTS rptDashboardKPIs")
 
-    cursor.execute("""
-        CREATE TABLE rptDashboardKPIs (
-            kpi_name TEXT PRIMARY KEY,
-            kpi_value REAL,
-            kpi_format TEXT,
-            kpi_category TEXT,
-            updated_at TEXT
-        )
-    """)
+    kpi_col_defs = ', '.join(f'"{kpi_name}" REAL' for kpi_name, _, _, _ in KPI_COLUMNS)
+    cursor.execute(f"CREATE TABLE rptDashboardKPIs ({kpi_col_defs}, updated_at TEXT)")
 
-    # Calculate KPIs based on available tables
-    kpis = []
-
-    # Customer count
-    if table_exists(conn, 'stgCustomerProfiles'):
-        cursor.execute("SELECT COUNT(*) FROM stgCustomerProfiles")
-        count = cursor.fetchone()[0]
-        kpis.append(('total_customers', count, 'number', 'customer', now))
-
-        # Active customers
-        cursor.execute("SELECT COUNT(*) FROM stgCustomerProfiles WHERE status = 'active' OR status IS NULL")
-        active = cursor.fetchone()[0]
-        kpis.append(('active_customers', active, 'number', 'customer', now))
-
-    # Account count and balance
-    if table_exists(conn, 'stgAccountProducts'):
-        cursor.execute("SELECT COUNT(*) FROM stgAccountProducts")
-        count = cursor.fetchone()[0]
-        kpis.append(('total_accounts', count, 'number', 'account', now))
-
-        cursor.execute("SELECT COALESCE(SUM(balance), 0) FROM stgAccountProducts")
-        balance = cursor.fetchone()[0]
-        kpis.append(('total_balance', balance, 'currency', 'account', now))
-
-        cursor.execute("SELECT COALESCE(AVG(balance), 0) FROM stgAccountProducts")
-        avg_balance = cursor.fetchone()[0]
-        kpis.append(('avg_account_balance', avg_balance, 'currency', 'account', now))
-
-    # Loan metrics
-    if table_exists(conn, 'stgLoans'):
-        cursor.execute("SELECT COUNT(*) FROM stgLoans")
-        count = cursor.fetchone()[0]
-        kpis.append(('total_loans', count, 'number', 'loan', now))
-
-        cursor.execute("SELECT COALESCE(SUM(principal), 0) FROM stgLoans")
-        total = cursor.fetchone()[0]
-        kpis.append(('total_loan_amount', total, 'currency', 'loan', now))
-
-        cursor.execute("SELECT COUNT(*) FROM stgLoans WHERE status = 'active' OR status IS NULL")
-        active = cursor.fetchone()[0]
-        kpis.append(('active_loans', active, 'number', 'loan', now))
-
-    # Transaction metrics
-    if table_exists(conn, 'stgPendingTransactions'):
-        cursor.execute("SELECT COUNT(*) FROM stgPendingTransactions")
-        count = cursor.fetchone()[0]
-        kpis.append(('pending_transactions', count, 'number', 'transaction', now))
-
-        cursor.execute("SELECT COALESCE(SUM(amount), 0) FROM stgPendingTransactions")
-        amount = cursor.fetchone()[0]
-        kpis.append(('pending_amount', amount, 'currency', 'transaction', now))
-
-    if table_exists(conn, 'stgFailedTransactions'):
-        cursor.execute("SELECT COUNT(*) FROM stgFailedTransactions")
-        count = cursor.fetchone()[0]
-        kpis.append(('failed_transactions', count, 'number', 'transaction', now))
-
-    # Branch and employee counts
-    if table_exists(conn, 'stgBranches'):
-        cursor.execute("SELECT COUNT(*) FROM stgBranches")
-        count = cursor.fetchone()[0]
-        kpis.append(('total_branches', count, 'number', 'operations', now))
-
-    if table_exists(conn, 'stgEmployees'):
-        cursor.execute("SELECT COUNT(*) FROM stgEmployees")
-        count = cursor.fetchone()[0]
-        kpis.append(('total_employees', count, 'number', 'operations', now))
-
-    if table_exists(conn, 'stgAtmLocations'):
-        cursor.execute("SELECT COUNT(*) FROM stgAtmLocations")
-        count = cursor.fetchone()[0]
-        kpis.append(('total_atms', count, 'number', 'operations', now))
-
-    # Credit card metrics
-    if table_exists(conn, 'stgCreditCards'):
-        cursor.execute("SELECT COUNT(*) FROM stgCreditCards")
-        count = cursor.fetchone()[0]
-        kpis.append(('total_credit_cards', count, 'number', 'products', now))
-
-        cursor.execute("SELECT COALESCE(SUM(credit_limit), 0) FROM stgCreditCards")
-        total = cursor.fetchone()[0]
-        kpis.append(('total_credit_limit', total, 'currency', 'products', now))
-
-    # Investment metrics
-    if table_exists(conn, 'stgInvestments'):
-        cursor.execute("SELECT COUNT(*) FROM stgInvestments")
-        count = cursor.fetchone()[0]
-        kpis.append(('total_investments', count, 'number', 'products', now))
-
-        cursor.execute("SELECT COALESCE(SUM(current_value), 0) FROM stgInvestments")
-        total = cursor.fetchone()[0]
-        kpis.append(('total_investment_value', total, 'currency', 'products', now))
-
-    # Insert KPIs
-    for kpi in kpis:
-        cursor.execute("""
-            INSERT INTO rptDashboardKPIs (kpi_name, kpi_value, kpi_format, kpi_category, updated_at)
-            VALUES (?, ?, ?, ?, ?)
-        """, kpi)
+    kv_selects = " UNION ALL ".join(
+        f"""SELECT '{kpi_name}' as kpi_name, "{kpi_name}" as kpi_value, '{kpi_format}' as kpi_format,
+                   '{kpi_category}' as kpi_category, updated_at
+            FROM rptDashboardKPIs WHERE "{kpi_name}" IS NOT NULL"""
+        for kpi_name, _, kpi_format, kpi_category in KPI_COLUMNS
+    )
+    cursor.execute(f"CREATE VIEW rptDashboardKPIs_kv AS {kv_selects}")
+
+    # Calculate KPIs based on available tables, one query per table. The
+    # queries only read committed staging data, so with several workers
+    # they scan their tables concurrently on separate connections
+    tables = get_table_names(conn)
+    queries = [(table_name, kpi_defs) for table_name, kpi_defs in KPI_QUERIES if table_name in tables]
+
+    if KPI_WORKERS > 1 and len(queries) > 1:
+        db_path = conn.execute("PRAGMA database_list").fetchone()[2]
+        readers, opened = threading.local(), []
+        try:
+            with ThreadPoolExecutor(max_workers=KPI_WORKERS, initializer=open_kpi_reader,
+                                    initargs=(db_path, readers, opened)) as executor:
+                results = list(executor.map(lambda query: query_kpis(readers, *query), queries))
+        finally:
+            for reader in opened:
+                reader.close()
+    else:
+        results = [cursor.execute(get_kpi_sql(*query)).fetchone() for query in queries]
+
+    kpis = {}
+    for (_, kpi_defs), values in zip(queries, results):
+        for (kpi_name, _, _, _), value in zip(kpi_defs, values):
+            kpis[kpi_name] = value
+
+    # Insert the KPI row
+    cursor.execute(INSERT_KPI_SQL, [kpis.get(kpi_name) for kpi_name, _, _, _ in KPI_COLUMNS] + [now])
 
-    conn.commit()
     print(f"    Created {len(kpis)} KPIs")
     return len(kpis)
 
 
-def create_customer_summary(conn):
+def create_customer_summary(conn, now):
     """
     Create rptCustomerSummary - Customer analytics by segment.
     """
@@ -191,12 +262,24 @@ def create_customer_summary(conn):
     print("\n  Creating rptCustomerSummary...")
 
     cursor = conn.cursor()
-    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
     cursor.execute("DROP TABLE IF EXISTS rptCustomerSummary")
 
+    # Keyed on the output (defaulted) values, so rows with a NULL and a
+    # default value fall into one group
     cursor.execute("""
-        CREATE TABLE rptCustomerSummary AS
+        CREATE TABLE rptCustomerSummary (
+            segment TEXT,
+            risk_rating TEXT,
+            customer_count INTEGER,
+            status TEXT,
+            updated_at TEXT,
+            PRIMARY KEY (segment, risk_rating, status)
+        ) WITHOUT ROWID
+    """)
+
+    cursor.execute("""
+        INSERT INTO rptCustomerSummary
         SELECT
             COALESCE(segment, 'Unknown') as segment,
             COALESCE(risk_rating, 'Unknown') as risk_rating,
@@ -204,18 +287,14 @@ def create_customer_summary(conn):
             COALESCE(status, 'active') as status,
             ? as updated_at
         FROM stgCustomerProfiles
-        GROUP BY segment, risk_rating, status
+        GROUP BY 1, 2, 4
     """, (now,))
-
-    conn.commit()
-
-    cursor.execute("SELECT COUNT(*) FROM rptCustomerSummary")
-    count = cursor.fetchone()[0]
+    count = cursor.rowcount
     print(f"    Created {count} summary rows")
     return count
 
 
-def create_account_summary(conn):
+def create_account_summary(conn, now):
     """
     Create rptAccountSummary - Account analytics by type.
     """
@@ -226,12 +305,26 @@ def create_account_summary(conn):
     print("\n  Creating rptAccountSummary...")
 
     cursor = conn.cursor()
-    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
     cursor.execute("DROP TABLE IF EXISTS rptAccountSummary")
 
     cursor.execute("""
-        CREATE TABLE rptAccountSummary AS
+        CREATE TABLE rptAccountSummary (
+            account_type TEXT,
+            currency TEXT,
+            status TEXT,
+            account_count INTEGER,
+            total_balance REAL,
+            avg_balance REAL,
+            min_balance REAL,
+            max_balance REAL,
+            updated_at TEXT,
+            PRIMARY KEY (account_type, currency, status)
+        ) WITHOUT ROWID
+    """)
+
+    cursor.execute("""
+        INSERT INTO rptAccountSummary
         SELECT
             COALESCE(account_type, 'Unknown') as account_type,
             COALESCE(currency, 'USD') as currency,
@@ -243,25 +336,20 @@ def create_account_summary(conn):
             COALESCE(MAX(balance), 0) as max_balance,
             ? as updated_at
         FROM stgAccountProducts
-        GROUP BY account_type, currency, status
+        GROUP BY 1, 2, 3
     """, (now,))
-
-    conn.commit()
-
-    cursor.execute("SELECT COUNT(*) FROM rptAccountSummary")
-    count = cursor.fetchone()[0]
+    count = cursor.rowcount
     print(f"    Created {count} summary rows")
     return count
 
 
-def create_transaction_summary(conn):
+def create_transaction_summary(conn, now):
     """
     Create rptTransactionSummary - Transaction analytics.
     """
     print("\n  Creating rptTransactionSummary...")
 
     cursor = conn.cursor()
-    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
     cursor.execute("DROP TABLE IF EXISTS rptTransactionSummary")
 
@@ -277,8 +365,12 @@ def create_transaction_summary(conn):
         )
     """)
 
+    tables = get_table_names(conn)
+
+    count = 0
+
     # Pending transactions
-    if table_exists(conn, 'stgPendingTransactions'):
+    if 'stgPendingTransactions' in tables:
         cursor.execute("""
             INSERT INTO rptTransactionSummary
             SELECT
@@ -292,9 +384,10 @@ def create_transaction_summary(conn):
             FROM stgPendingTransactions
             GROUP BY transaction_type, status
         """, (now,))
+        count += cursor.rowcount
 
     # Failed transactions
-    if table_exists(conn, 'stgFailedTransactions'):
+    if 'stgFailedTransactions' in tables:
         cursor.execute("""
             INSERT INTO rptTransactionSummary
             SELECT
@@ -308,16 +401,13 @@ def create_transaction_summary(conn):
             FROM stgFailedTransactions
             GROUP BY transaction_type
         """, (now,))
+        count += cursor.rowcount
 
-    conn.commit()
-
-    cursor.execute("SELECT COUNT(*) FROM rptTransactionSummary")
-    count = cursor.fetchone()[0]
     print(f"    Created {count} summary rows")
     return count
 
 
-def create_loan_summary(conn):
+def create_loan_summary(conn, now):
     """
     Create rptLoanSummary - Loan portfolio analytics.
     """
@@ -328,12 +418,24 @@ def create_loan_summary(conn):
     print("\n  Creating rptLoanSummary...")
 
     cursor = conn.cursor()
-    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
     cursor.execute("DROP TABLE IF EXISTS rptLoanSummary")
 
     cursor.execute("""
-        CREATE TABLE rptLoanSummary AS
+        CREATE TABLE rptLoanSummary (
+            loan_type TEXT,
+            status TEXT,
+            loan_count INTEGER,
+            total_principal REAL,
+            avg_principal REAL,
+            avg_interest_rate REAL,
+            total_outstanding REAL,
+            updated_at TEXT
+        )
+    """)
+
+    cursor.execute("""
+        INSERT INTO rptLoanSummary
         SELECT
             COALESCE(loan_type, 'Unknown') as loan_type,
             COALESCE(status, 'active') as status,
@@ -346,85 +448,86 @@ def create_loan_summary(conn):
         FROM stgLoans
         GROUP BY loan_type, status
     """, (now,))
-
-    conn.commit()
-
-    cursor.execute("SELECT COUNT(*) FROM rptLoanSummary")
-    count = cursor.fetchone()[0]
+    count = cursor.rowcount
     print(f"    Created {count} summary rows")
     return count
 
 
-def create_branch_summary(conn):
+def create_branch_summary(conn, now):
     """
     Create rptBranchSummary - Branch performance metrics.
     """
-    if not table_exists(conn, 'stgBranches'):
+    tables = get_table_names(conn)
+
+    if 'stgBranches' not in tables:
         print("\n  Skipping rptBranchSummary - stgBranches not found")
         return 0
 
     print("\n  Creating rptBranchSummary...")
 
     cursor = conn.cursor()
-    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
     cursor.execute("DROP TABLE IF EXISTS rptBranchSummary")
 
-    # Basic branch summary
+    # Employee and account counts per branch, each from one GROUP BY joined
+    # to the branches (0 if the table, or the accounts' branch_id, is missing)
+    employee_count = '0'
+    account_count = '0'
+    joins = []
+
+    if 'stgEmployees' in tables:
+        joins.append("""
+            LEFT JOIN (SELECT branch_id, COUNT(*) as n FROM stgEmployees GROUP BY branch_id) e
+            ON e.branch_id = b.branch_id
+        """)
+        employee_count = 'COALESCE(e.n, 0)'
+
+    if 'stgAccountProducts' in tables and has_column(conn, 'stgAccountProducts', 'branch_id'):
+        joins.append("""
+            LEFT JOIN (SELECT branch_id, COUNT(*) as n FROM stgAccountProducts GROUP BY branch_id) a
+            ON a.branch_id = b.branch_id
+        """)
+        account_count = 'COALESCE(a.n, 0)'
+
     cursor.execute("""
-        CREATE TABLE rptBranchSummary AS
+        CREATE TABLE rptBranchSummary (
+            branch_id TEXT,
+            branch_name TEXT,
+            city TEXT,
+            state TEXT,
+            customer_count INTEGER,
+            account_count INTEGER,
+            employee_count INTEGER,
+            updated_at TEXT
+        )
+    """)
+
+    cursor.execute(f"""
+        INSERT INTO rptBranchSummary
         SELECT
             b.branch_id,
             b.branch_name,
             b.city,
             COALESCE(b.state, '') as state,
             0 as customer_count,
-            0 as account_count,
-            0 as employee_count,
+            {account_count} as account_count,
+            {employee_count} as employee_count,
             ? as updated_at
         FROM stgBranches b
+        {''.join(joins)}
     """, (now,))
-
-    # Update employee counts if available
-    if table_exists(conn, 'stgEmployees'):
-        cursor.execute("""
-            UPDATE rptBranchSummary
-            SET employee_count = (
-                SELECT COUNT(*) FROM stgEmployees e
-                WHERE e.branch_id = rptBranchSummary.branch_id
-            )
-        """)
-
-    # Update account counts if available (and branch_id exists)
-    if table_exists(conn, 'stgAccountProducts'):
-        try:
-            cursor.execute("""
-                UPDATE rptBranchSummary
-                SET account_count = (
-                    SELECT COUNT(*) FROM stgAccountProducts a
-                    WHERE a.branch_id = rptBranchSummary.branch_id
-                )
-            """)
-        except:
-            pass  # branch_id might not exist in accounts
-
-    conn.commit()
-
-    cursor.execute("SELECT COUNT(*) FROM rptBranchSummary")
-    count = cursor.fetchone()[0]
+    count = cursor.rowcount
     print(f"    Created {count} summary rows")
     return count
 
 
-def create_daily_metrics(conn):
+def create_daily_metrics(conn, now):
     """
     Create rptDailyMetrics - Time series data for charts.
     """
     print("\n  Creating rptDailyMetrics...")
 
     cursor = conn.cursor()
-    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    today = datetime.now().strftime("%Y-%m-%d")
 
     cursor.execute("DROP TABLE IF EXISTS rptDailyMetrics")
 
@@ -438,48 +541,116 @@ def create_daily_metrics(conn):
         )
     """)
 
-    # Count records imported today (from raw tables metadata)
-    metrics = []
-
-    # Get table counts by _imported_at date
+    # Count records imported per day (from raw tables metadata)
     cursor.execute("""
         SELECT name FROM sqlite_master
         WHERE type='table' AND name LIKE 'raw%'
     """)
-    raw_tables = [row[0] for row in cursor.fetchall()]
+    raw_tables = [row[0] for row in cursor.fetchall()
+                  if has_column(conn, row[0], '_imported_at')]
 
-    for table in raw_tables:
-        try:
-            cursor.execute(f"""
-                SELECT DATE(_imported_at) as import_date, COUNT(*) as count
-                FROM [{table}]
-                WHERE _imported_at IS NOT NULL
-                GROUP BY DATE(_imported_at)
-            """)
-            for row in cursor.fetchall():
-                if row[0]:
-                    metrics.append((row[0], f'imported_{table}', row[1], now))
-        except:
-            pass
-
-    # Insert metrics
-    for metric in metrics:
-        cursor.execute("""
-            INSERT OR REPLACE INTO rptDailyMetrics (metric_date, metric_name, metric_value, updated_at)
-            VALUES (?, ?, ?, ?)
-        """, metric)
+    if not raw_tables:
+        print("    Created 0 daily metrics")
+        return 0
+
+    # Per-day counts of every raw table, built and inserted in one statement
+    counts_sql = " UNION ALL ".join(
+        f"""SELECT DATE(_imported_at) as import_date, 'imported_{table}' as metric_name, COUNT(*) as count
+            FROM [{table}]
+            WHERE DATE(_imported_at) IS NOT NULL
+            GROUP BY 1"""
+        for table in raw_tables
+    )
+    cursor.execute(f"""
+        INSERT OR REPLACE INTO rptDailyMetrics (metric_date, metric_name, metric_value, updated_at)
+        SELECT import_date, metric_name, count, ?
+        FROM ({counts_sql})
+    """, (now,))
+    count = cursor.rowcount
+
+    print(f"    Created {count} daily metrics")
+    return count
+
+
+def create_dashboard_indexes(conn):
+    """
+    Create indexes for the dashboard's ORDER BY / WHERE columns on staging tables.
+    """
+    print("\n  Creating dashboard indexes...")
+
+    cursor = conn.cursor()
+    count = 0
+    tables = get_table_names(conn)
+
+    for index_name, table_name, columns in DASHBOARD_INDEXES:
+        if table_name not in tables:
+            continue
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON [{table_name}] ({columns})")
+        count += 1
+
+    for index_name in SUPERSEDED_INDEXES:
+        cursor.execute(f"DROP INDEX IF EXISTS {index_name}")
+
+    conn.commit()
+    print(f"    Ensured {count} indexes")
+    return count
+
+
+def create_report_indexes(conn):
+    """
+    Create the covering indexes for the report GROUP BYs on staging tables
+    (skipping tables or columns that don't exist).
+    """
+    print("\n  Creating report indexes...")
+
+    cursor = conn.cursor()
+    count = 0
+    tables = get_table_names(conn)
+
+    for index_name, table_name, columns in REPORT_INDEXES:
+        if table_name not in tables:
+            continue
+        if not all(has_column(conn, table_name, column) for column in columns):
+            continue
+        column_list = ', '.join(f'"{column}"' for column in columns)
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON [{table_name}] ({column_list})")
+        count += 1
+
+    conn.commit()
+    print(f"    Ensured {count} indexes")
+    return count
+
+
+def analyze_staging_tables(conn):
+    """
+    Refresh the query planner statistics (sqlite_stat1) of the staging
+    tables and their indexes, so the report GROUP BYs get the best plans.
+    analysis_limit samples a bounded number of rows per index, which keeps
+    this cheap on large tables.
+    """
+    cursor = conn.cursor()
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name LIKE 'stg%'")
+    stg_tables = [row[0] for row in cursor.fetchall()]
+
+    cursor.execute("PRAGMA analysis_limit=1000")
+    for table_name in stg_tables:
+        cursor.execute(f"ANALYZE [{table_name}]")
 
     conn.commit()
-    print(f"    Created {len(metrics)} daily metrics")
-    return len(metrics)
+    return len(stg_tables)
 
 
 # ============================================================================
 # MAIN
 # ============================================================================
 
-def main():
-    """Main entry point for staging to reporting processor."""
+def main(conn=None):
+    """
+    Main entry point for staging to reporting processor.
+
+    conn is an open connection to reuse (run_pipeline.py passes one);
+    by default the database is opened here.
+    """
 
     print("=" * 70)
     print("STAGING TO REPORTING PROCESSOR")
@@ -503,37 +674,68 @@ def main():
 
     print(f"\nDatabase: {db_path}")
 
-    # Connect to database
-    conn = sqlite3.connect(db_path)
+    # Connect to database. Transactions are opened explicitly, as on the
+    # connection run_pipeline.py passes in. WAL with synchronous=NORMAL skips
+    # the fsync on every commit (report tables can always be rebuilt from
+    # staging); a 256 MB page cache, memory-mapped reads and in-memory temp
+    # B-trees speed up the aggregations
+    own_conn = conn is None
+    if own_conn:
+        conn = sqlite3.connect(db_path, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-262144")
+        conn.execute("PRAGMA mmap_size=268435456")
 
     print("\n" + "=" * 70)
     print("CREATING REPORT TABLES")
     print("=" * 70)
 
-    # Create all report tables
+    TABLE_COLUMNS.clear()
+
+    # Index staging columns the report queries group by, then refresh the
+    # planner statistics
+    create_report_indexes(conn)
+    analyze_staging_tables(conn)
+
+    # Create all report tables in one transaction (a single commit); every
+    # report row gets the same updated_at
     results = {}
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    conn.execute("BEGIN IMMEDIATE")
+
+    results['kpis'] = create_kpi_summary(conn, now)
+    results['customer'] = create_customer_summary(conn, now)
+    results['account'] = create_account_summary(conn, now)
+    results['transaction'] = create_transaction_summary(conn, now)
+    results['loan'] = create_loan_summary(conn, now)
+    results['branch'] = create_branch_summary(conn, now)
+    results['daily'] = create_daily_metrics(conn, now)
+    conn.commit()
 
-    results['kpis'] = create_kpi_summary(conn)
-    results['customer'] = create_customer_summary(conn)
-    results['account'] = create_account_summary(conn)
-    results['transaction'] = create_transaction_summary(conn)
-    results['loan'] = create_loan_summary(conn)
-    results['branch'] = create_branch_summary(conn)
-    results['daily'] = create_daily_metrics(conn)
+    # Index staging columns used by dashboard filters and sorts
+    create_dashboard_indexes(conn)
 
-    # Update metadata
+    # Update metadata and cached row counts in one transaction
+    conn.execute("BEGIN")
     cursor = conn.cursor()
-    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    try:
+    # The metadata table might not exist (databases not made by database_creator.py)
+    if table_exists(conn, '_etl_metadata'):
         cursor.execute("""
             INSERT OR REPLACE INTO _etl_metadata (key, value, created_at, updated_at)
             VALUES ('last_report_refresh', ?, ?, ?)
         """, (now, now, now))
-        conn.commit()
-    except:
-        pass
 
-    conn.close()
+    # Refresh cached row counts of the tables written above (every report
+    # table is rebuilt, ANALYZE rewrites sqlite_stat1) for the dashboard (commits)
+    update_table_counts(conn, [name for name in get_table_names(conn) if name.startswith('rpt')]
+                        + ['_etl_metadata', 'sqlite_stat1'])
+
+    TABLE_COLUMNS.clear()
+    if own_conn:
+        conn.close()
 
     # Summary
     print("\n" + "=" * 70)
@@ -542,7 +744,7 @@ def main():
 
     total_rows = sum(results.values())
     print(f"\nReport tables created/updated:")
-    print(f"  - rptDashboardKPIs: {results['kpis']} rows")
+    print(f"  - rptDashboardKPIs: {results['kpis']} KPIs (1 row)")
     print(f"  - rptCustomerSummary: {results['customer']} rows")
     print(f"  - rptAccountSummary: {results['account']} rows")
     print(f"  - rptTransactionSummary: {results['transaction']} rows")
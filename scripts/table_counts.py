@@ -0,0 +1,67 @@
+"""
+Table Counts
+============
+Maintains _table_counts - row counts per table, read by the dashboard so it
+doesn't have to COUNT(*) each table on every page load. Each ETL step
+refreshes only the tables it wrote (csv_importer.py, raw_to_stg.py,
+stg_to_rpt.py, enrich_existing_data.py).
+
+Author: Nevra Donat
+"""
+
+from datetime import datetime
+
+
+def update_table_counts(conn, tables, known_counts=None):
+    """
+    Refresh the _table_counts rows of the given tables and commit.
+
+    known_counts maps table names to row counts the caller already has;
+    the other tables are counted with COUNT(*). Tables that don't exist are
+    skipped and rows of dropped tables removed. When _table_counts is first
+    created every table is counted, so it starts out complete.
+
+    Returns:
+        number of tables refreshed
+    """
+    cursor = conn.cursor()
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    known_counts = known_counts or {}
+
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name != '_table_counts'")
+    existing = {row[0] for row in cursor.fetchall()}
+
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='_table_counts'")
+    if cursor.fetchone() is None:
+        cursor.execute("""
+            CREATE TABLE _table_counts (
+                name TEXT PRIMARY KEY,
+                n INTEGER,
+                updated_at TEXT
+            )
+        """)
+        tables = existing
+    else:
+        cursor.execute("""
+            DELETE FROM _table_counts
+            WHERE name NOT IN (SELECT name FROM sqlite_master WHERE type='table')
+        """)
+        tables = existing.intersection(tables)
+
+    cursor.executemany(
+        "INSERT OR REPLACE INTO _table_counts (name, n, updated_at) VALUES (?, ?, ?)",
+        [(name, known_counts[name], now) for name in sorted(tables) if name in known_counts]
+    )
+
+    to_count = sorted(name for name in tables if name not in known_counts)
+    if to_count:
+        counts_sql = " UNION ALL ".join(
+            f"SELECT '{name}', COUNT(*), ? FROM [{name}]" for name in to_count
+        )
+        cursor.execute(
+            f"INSERT OR REPLACE INTO _table_counts (name, n, updated_at) {counts_sql}",
+            (now,) * len(to_count)
+        )
+
+    conn.commit()
+    return len(tables)